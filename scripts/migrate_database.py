@@ -10,6 +10,7 @@ License: MIT
 """
 
 import sys
+import argparse
 import asyncio
 from pathlib import Path
 
@@ -20,45 +21,59 @@ sys.path.insert(0, str(project_root / "src"))
 from cursorrules_mcp.migration import perform_database_migration
 
 
+def parse_args():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="CursorRules-MCP 规则库数据化迁移")
+    parser.add_argument(
+        "--bulk",
+        action="store_true",
+        help="批量导入模式：导入期间不逐条重建索引，导入完成后统一构建"
+    )
+    return parser.parse_args()
+
+
 async def main():
     """主函数"""
-    print("🚀 开始执行CursorRules-MCP规则库数据化...")
-    print("="*60)
+    args = parse_args()
+    sys.stdout.write("🚀 开始执行CursorRules-MCP规则库数据化...\n" + "=" * 60 + "\n")
     
     try:
         # 执行完整的数据库迁移
-        database = await perform_database_migration()
-        
-        print("\n" + "="*60)
-        print("✅ 规则库数据化完成！")
-        print("\n📊 最终统计:")
+        database = await perform_database_migration(bulk=args.bulk)
         
         stats = database.get_database_stats()
-        print(f"  总规则数量: {stats['total_rules']}")
-        print(f"  版本总数: {stats['total_versions']}")
-        print(f"  活跃规则: {stats['active_rules']}")
-        print(f"  支持语言: {stats['languages']} 种")
-        print(f"  覆盖领域: {stats['domains']} 个")
-        print(f"  规则类型: {stats['rule_types']} 种")
-        print(f"  标签数量: {stats['total_tags']} 个")
-        
-        print("\n🎯 功能验证:")
-        print("  ✅ 版本管理: 支持规则版本控制和历史跟踪")
-        print("  ✅ 冲突检测: 自动检测规则间的冲突和覆盖关系")
-        print("  ✅ 规则索引: 按语言、领域、标签建立高效索引")
-        print("  ✅ 数据库接口: 完整的CRUD操作支持")
-        print("  ✅ 扩展规则库: 生成覆盖多领域的丰富规则集")
-        
-        print("\n📂 生成的文件:")
-        print("  📁 data/rules/migrated/: 迁移后的规则")
-        print("  📁 data/rules/generated/: 新生成的规则")
-        print("  📄 data/rules/database_report.json: 数据库统计报告")
-        
-        print("\n🔧 使用方法:")
-        print("  python scripts/cursorrules_cli.py search --language python")
-        print("  python scripts/cursorrules_cli.py validate file.py")
-        print("  python scripts/cursorrules_cli.py stats")
-        print("  python scripts/start_mcp.py")
+        # 汇总信息合并为一次写出
+        sys.stdout.write(f"""
+{'=' * 60}
+✅ 规则库数据化完成！
+
+📊 最终统计:
+  总规则数量: {stats['total_rules']}
+  版本总数: {stats['total_versions']}
+  活跃规则: {stats['active_rules']}
+  支持语言: {stats['languages']} 种
+  覆盖领域: {stats['domains']} 个
+  规则类型: {stats['rule_types']} 种
+  标签数量: {stats['total_tags']} 个
+
+🎯 功能验证:
+  ✅ 版本管理: 支持规则版本控制和历史跟踪
+  ✅ 冲突检测: 自动检测规则间的冲突和覆盖关系
+  ✅ 规则索引: 按语言、领域、标签建立高效索引
+  ✅ 数据库接口: 完整的CRUD操作支持
+  ✅ 扩展规则库: 生成覆盖多领域的丰富规则集
+
+📂 生成的文件:
+  📁 data/rules/migrated/: 迁移后的规则
+  📁 data/rules/generated/: 新生成的规则
+  📄 data/rules/database_report.json: 数据库统计报告
+
+🔧 使用方法:
+  python scripts/cursorrules_cli.py search --language python
+  python scripts/cursorrules_cli.py validate file.py
+  python scripts/cursorrules_cli.py stats
+  python scripts/start_mcp.py
+""")
         
     except Exception as e:
         print(f"\n❌ 迁移过程中发生错误: {e}")
@@ -13,12 +13,15 @@ import asyncio
 import sys
 import argparse
 import logging
+import os
 from pathlib import Path
 
 # 添加项目根目录到Python路径
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.cursorrules_mcp.http_server import MCPHttpServer
+from src.cursorrules_mcp.logging_setup import setup_queue_logging, stop_queue_logging
+from src.cursorrules_mcp._eventloop import install_uvloop
 
 # 配置日志
 logging.basicConfig(
@@ -28,6 +31,20 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def prepare_rule_snapshot(rules_path: Path, templates_path: Path) -> None:
+    """在父进程中生成规则快照（规则文件未变化时复用已有快照）"""
+    from src.cursorrules_mcp.engine import RuleEngine
+    
+    try:
+        engine = RuleEngine(str(rules_path), str(templates_path))
+        if not engine.load_snapshot():
+            asyncio.run(engine.load_rules())
+            engine.build_indexes()
+            engine.save_snapshot()
+    except Exception as e:
+        logger.warning(f"生成规则快照失败，各工作进程将分别加载规则: {e}")
+
+
 def main():
     """主函数"""
     parser = argparse.ArgumentParser(
@@ -103,6 +120,7 @@ API端点:
     )
     
     args = parser.parse_args()
+    has_uvloop = install_uvloop()
     
     # 加载主配置
     from src.cursorrules_mcp.config import get_config
@@ -116,8 +134,9 @@ API端点:
     port = getattr(config.server, 'port', args.port)
     workers = getattr(config.server, 'workers', args.workers)
     
-    # 设置日志级别
+    # 设置日志级别，日志输出交由后台线程处理
     logging.getLogger().setLevel(getattr(logging, log_level))
+    setup_queue_logging()
     
     # 验证规则目录
     if not rules_path.exists():
@@ -125,26 +144,28 @@ API端点:
         logger.info("将在首次启动时创建规则目录和示例规则")
     
     # 显示启动信息
-    logger.info("=" * 60)
-    logger.info("🚀 CursorRules-MCP HTTP服务器")
-    logger.info("=" * 60)
-    logger.info(f"📁 规则目录: {rules_path}")
-    logger.info(f"📁 模板目录: {templates_path}")
-    logger.info(f"🌐 服务地址: http://{host}:{port}")
-    logger.info(f"📊 日志级别: {log_level}")
-    logger.info(f"🔄 自动重载: {'启用' if args.reload else '禁用'}")
-    logger.info(f"👥 工作进程: {workers}")
-    logger.info("=" * 60)
-    logger.info("")
-    logger.info("📋 可用端点:")
-    logger.info(f"  • 健康检查:    http://{host}:{port}/health")
-    logger.info(f"  • MCP信息:     http://{host}:{port}/mcp/info") 
-    logger.info(f"  • API文档:     http://{host}:{port}/docs")
-    logger.info(f"  • JSON-RPC:    http://{host}:{port}/mcp/jsonrpc")
-    logger.info(f"  • SSE流:       http://{host}:{port}/mcp/sse")
-    logger.info("")
-    logger.info("💡 按 Ctrl+C 停止服务器")
-    logger.info("=" * 60)
+    logger.info("\n".join([
+        "=" * 60,
+        "🚀 CursorRules-MCP HTTP服务器",
+        "=" * 60,
+        f"📁 规则目录: {rules_path}",
+        f"📁 模板目录: {templates_path}",
+        f"🌐 服务地址: http://{host}:{port}",
+        f"📊 日志级别: {log_level}",
+        f"🔄 自动重载: {'启用' if args.reload else '禁用'}",
+        f"👥 工作进程: {workers}",
+        "=" * 60,
+        "",
+        "📋 可用端点:",
+        f"  • 健康检查:    http://{host}:{port}/health",
+        f"  • MCP信息:     http://{host}:{port}/mcp/info",
+        f"  • API文档:     http://{host}:{port}/docs",
+        f"  • JSON-RPC:    http://{host}:{port}/mcp/jsonrpc",
+        f"  • SSE流:       http://{host}:{port}/mcp/sse",
+        "",
+        "💡 按 Ctrl+C 停止服务器",
+        "=" * 60,
+    ]))
     
     try:
         # 创建并启动服务器
@@ -155,8 +176,12 @@ API端点:
             workers=workers
         )
         
+        # 支持fork的平台上多进程模式由父进程预加载规则后fork工作进程（写时复制共享）；
+        # 否则预先生成规则快照，由uvicorn以spawn方式启动的各工作进程通过mmap共享加载
+        if workers > 1 and not args.reload and not hasattr(os, "fork"):
+            prepare_rule_snapshot(rules_path, templates_path)
+        
         # 设置环境变量，供多进程模式使用
-        import os
         os.environ["CURSORRULES_RULES_DIR"] = str(rules_path)
         os.environ["CURSORRULES_TEMPLATES_DIR"] = str(templates_path)
         os.environ["CURSORRULES_HOST"] = host
@@ -175,7 +200,8 @@ API端点:
                 port=port,
                 reload=True,
                 log_level=log_level.lower(),
-                factory=True
+                factory=True,
+                loop="uvloop" if has_uvloop else "auto"
             )
         else:
             server.run()
@@ -185,6 +211,8 @@ API端点:
     except Exception as e:
         logger.error(f"❌ 服务器启动失败: {e}")
         sys.exit(1)
+    finally:
+        stop_queue_logging()
 
 
 if __name__ == "__main__":
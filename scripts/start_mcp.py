@@ -16,10 +16,13 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from src.cursorrules_mcp.server import CursorRulesMCPServer
+from src.cursorrules_mcp.server import get_mcp_server
+from src.cursorrules_mcp._eventloop import install_uvloop
+
 
 def main():
     """主函数"""
+    install_uvloop()
     try:
         from src.cursorrules_mcp.config import get_config_manager
         
@@ -27,12 +30,15 @@ def main():
         config_manager = get_config_manager()
         config = config_manager.config
         
-        print("🚀 启动 CursorRules-MCP 服务器...")
-        print(f"📂 规则目录: {config.rules_dir}")
-        print(f"🔧 调试模式: {'开启' if config.debug else '关闭'}")
+        # 启动信息合并为一次写出
+        sys.stdout.write("\n".join([
+            "🚀 启动 CursorRules-MCP 服务器...",
+            f"📂 规则目录: {config.rules_dir}",
+            f"🔧 调试模式: {'开启' if config.debug else '关闭'}",
+        ]) + "\n")
         
         # 创建服务器
-        server = CursorRulesMCPServer(config.rules_dir)
+        server = get_mcp_server(config.rules_dir)
         
         # 直接运行FastMCP服务器，它会自己管理事件循环
         server.mcp.run()
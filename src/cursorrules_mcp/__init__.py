@@ -16,25 +16,61 @@ __version__ = "0.1.0"
 __author__ = "Mapoet (NUS/STAR)"
 __description__ = "Intelligent rule-based context management for LLMs via MCP"
 
+import importlib
+from typing import TYPE_CHECKING
+
 from .config import ConfigManager, get_config, get_config_manager
 
-# 导入核心模块
-from .engine import RuleEngine
-
-# 导入数据模型
-from .models import (
-    ContentType,
-    CursorRule,
-    MCPContext,
-    RuleType,
-    SearchFilter,
-    TaskType,
-    ValidationIssue,
-    ValidationResult,
-    ValidationSeverity,
-)
-from .server import CursorRulesMCPServer
-from .validators import ValidationManager, get_validation_manager
+# 核心模块、数据模型和工具函数在首次访问时才导入（PEP 562），
+# 命令行等只用到部分功能的场景无需加载规则引擎、MCP服务器等重量级依赖
+_LAZY_IMPORTS = {
+    # 核心模块
+    "RuleEngine": ".engine",
+    "CursorRulesMCPServer": ".server",
+    "get_mcp_server": ".server",
+    "ValidationManager": ".validators",
+    "get_validation_manager": ".validators",
+    # 数据模型
+    "ContentType": ".models",
+    "CursorRule": ".models",
+    "MCPContext": ".models",
+    "RuleType": ".models",
+    "SearchFilter": ".models",
+    "TaskType": ".models",
+    "ValidationIssue": ".models",
+    "ValidationResult": ".models",
+    "ValidationSeverity": ".models",
+}
+
+if TYPE_CHECKING:
+    from .engine import RuleEngine
+    from .models import (
+        ContentType,
+        CursorRule,
+        MCPContext,
+        RuleType,
+        SearchFilter,
+        TaskType,
+        ValidationIssue,
+        ValidationResult,
+        ValidationSeverity,
+    )
+    from .server import CursorRulesMCPServer, get_mcp_server
+    from .validators import ValidationManager, get_validation_manager
+
+
+def __getattr__(name: str):
+    """按需导入 _LAZY_IMPORTS 中登记的名称，导入后缓存为模块属性"""
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
 
 __all__ = [
     # 版本信息
@@ -60,4 +96,5 @@ __all__ = [
     "get_config",
     "get_config_manager",
     "get_validation_manager",
+    "get_mcp_server",
 ]
@@ -0,0 +1,25 @@
+"""
+CursorRules-MCP 事件循环设置
+安装uvloop时使用其事件循环策略，否则保持asyncio默认事件循环；CLI与启动脚本共用
+
+Author: Mapoet
+Institution: NUS/STAR
+Date: 2025-01-23
+License: MIT
+"""
+
+import asyncio
+
+
+def install_uvloop() -> bool:
+    """安装uvloop事件循环策略（可选依赖，未安装时使用默认asyncio事件循环）
+
+    Returns:
+        是否已安装uvloop事件循环策略
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
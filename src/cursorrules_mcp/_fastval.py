@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+CursorRules-MCP 验证加速内核
+提供内容校验热点路径的行扫描与多模式匹配内核：安装Numba时行扫描使用JIT编译版本，否则回退到numpy向量化实现；
+安装hyperscan时多模式匹配使用编译后的模式数据库，否则回退到re逐个匹配
+
+Author: Mapoet
+Institution: NUS/STAR
+Date: 2025-01-23
+License: MIT
+"""
+
+import logging
+import re
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+try:
+    from numba import njit, types as nb_types
+except ImportError:
+    njit = None
+    nb_types = None
+
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+logger = logging.getLogger(__name__)
+
+HAS_NUMBA = njit is not None
+HAS_HYPERSCAN = hyperscan is not None
+
+
+def _scan_long_lines_numpy(buf: np.ndarray, limit: int) -> Tuple[np.ndarray, np.ndarray]:
+    """numpy向量化实现：返回超长行的行号（从1开始）及其长度"""
+    newlines = np.flatnonzero(buf == 0x0A)
+    bounds = np.concatenate(([-1], newlines, [buf.size]))
+    lengths = np.diff(bounds) - 1
+    bad = np.flatnonzero(lengths > limit)
+    return (bad + 1).astype(np.int32), lengths[bad].astype(np.int32)
+
+
+if HAS_NUMBA:
+    # 显式签名使编译在导入时完成（或直接读取磁盘缓存），首次校验请求无需等待JIT编译；
+    # np.frombuffer 得到的是只读数组，因此同时声明只读与可写两种输入
+    _LINE_SCAN_RESULT = nb_types.UniTuple(nb_types.int32[:], 2)
+    _LINE_SCAN_SIGNATURES = [
+        _LINE_SCAN_RESULT(nb_types.Array(nb_types.uint32, 1, 'C', readonly=True), nb_types.int64),
+        _LINE_SCAN_RESULT(nb_types.uint32[::1], nb_types.int64),
+    ]
+
+    @njit(_LINE_SCAN_SIGNATURES, cache=True)
+    def _scan_long_lines_jit(buf, limit):
+        """单次遍历缓冲区，将超长行的行号和长度写入预分配数组"""
+        capacity = buf.size // (limit + 1) + 1
+        line_numbers = np.empty(capacity, dtype=np.int32)
+        lengths = np.empty(capacity, dtype=np.int32)
+        count = 0
+        line_no = 1
+        line_start = 0
+        for i in range(buf.size):
+            if buf[i] == 10:
+                length = i - line_start
+                if length > limit:
+                    line_numbers[count] = line_no
+                    lengths[count] = length
+                    count += 1
+                line_no += 1
+                line_start = i + 1
+        length = buf.size - line_start
+        if length > limit:
+            line_numbers[count] = line_no
+            lengths[count] = length
+            count += 1
+        return line_numbers[:count], lengths[:count]
+
+    scan_long_lines = _scan_long_lines_jit
+else:
+    scan_long_lines = _scan_long_lines_numpy
+
+
+def find_long_lines(content: str, limit: int = 79) -> List[Tuple[int, int]]:
+    """查找超过长度限制的行
+
+    Args:
+        content: 待检查内容
+        limit: 每行允许的最大字符数
+
+    Returns:
+        [(行号, 行长度), ...]，行号从1开始
+    """
+    if len(content) <= limit:
+        return []
+    # 按UTF-32编码后每个元素恰好对应一个字符，行长度与len(line)一致
+    buf = np.frombuffer(content.encode('utf-32-le'), dtype=np.uint32)
+    line_numbers, lengths = scan_long_lines(buf, limit)
+    return list(zip(line_numbers.tolist(), lengths.tolist()))
+
+
+def warmup() -> None:
+    """预热行扫描内核，确保编译产物在服务处理首个请求前就绪"""
+    find_long_lines("x" * 2, limit=1)
+
+
+class PatternScanner:
+    """多模式扫描器：一次扫描内容即可得到所有规则模式的首个匹配位置
+
+    安装hyperscan时将所有模式编译为同一个数据库并行匹配，否则回退到逐个re.search。
+    """
+
+    def __init__(self, patterns: List[Tuple[str, int, str]]):
+        """
+        Args:
+            patterns: [(rule_id, 条件序号, 正则表达式), ...]
+        """
+        self.keys: List[Tuple[str, int]] = []
+        self.expressions: List[str] = []
+        self._database = None
+        self._compiled: List[re.Pattern] = []
+
+        for rule_id, condition_index, pattern in patterns:
+            try:
+                compiled = re.compile(pattern)
+            except re.error as e:
+                logger.warning(f"规则 {rule_id} 的验证模式无效，已跳过: {e}")
+                continue
+            self.keys.append((rule_id, condition_index))
+            self.expressions.append(pattern)
+            self._compiled.append(compiled)
+
+        if HAS_HYPERSCAN and self.expressions:
+            try:
+                database = hyperscan.Database()
+                database.compile(
+                    expressions=[expr.encode('utf-8') for expr in self.expressions],
+                    ids=list(range(len(self.expressions))),
+                    elements=len(self.expressions),
+                    flags=[hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_SINGLEMATCH] * len(self.expressions)
+                )
+                self._database = database
+            except Exception as e:
+                logger.warning(f"hyperscan编译验证模式失败，回退到re逐个匹配: {e}")
+
+    def __bool__(self) -> bool:
+        return bool(self.expressions)
+
+    def scan(self, content: str) -> Dict[Tuple[str, int], int]:
+        """扫描内容
+
+        Returns:
+            {(rule_id, 条件序号): 匹配所在行号}，每个模式只报告首个匹配
+        """
+        hits: Dict[Tuple[str, int], int] = {}
+        if not self.expressions:
+            return hits
+
+        if self._database is not None:
+            data = content.encode('utf-8')
+
+            def on_match(pattern_id, start, end, flags, context):
+                key = self.keys[pattern_id]
+                if key not in hits:
+                    hits[key] = data.count(b'\n', 0, max(end - 1, 0)) + 1
+                return None
+
+            self._database.scan(data, match_event_handler=on_match)
+        else:
+            for key, compiled in zip(self.keys, self._compiled):
+                match = compiled.search(content)
+                if match:
+                    hits[key] = content.count('\n', 0, max(match.end() - 1, 0)) + 1
+        return hits
@@ -0,0 +1,48 @@
+"""
+CursorRules-MCP JSON编解码
+安装orjson时使用其C/Rust实现编解码，否则回退到标准库json，调用方无需关心具体实现
+
+Author: Mapoet
+Institution: NUS/STAR
+Date: 2025-01-23
+License: MIT
+"""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+HAS_ORJSON = orjson is not None
+
+
+def dumps(obj: Any, indent: bool = False) -> str:
+    """序列化为JSON字符串（非ASCII字符原样输出）
+
+    Args:
+        obj: 待序列化对象
+        indent: 是否以2个空格缩进输出
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option).decode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None)
+
+
+def dumpb(obj: Any) -> bytes:
+    """序列化为紧凑的UTF-8 JSON字节串（用于NDJSON等直接写出字节的场景，orjson可用时无需再编码）"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+
+def loads(data: Union[str, bytes, bytearray, memoryview]) -> Any:
+    """解析JSON字符串或UTF-8字节串"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(bytes(data) if isinstance(data, memoryview) else data)
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+CursorRules-MCP YAML规则解析缓存生成工具
+预先解析规则目录中的YAML规则文件并写入缓存，服务启动时直接读取缓存
+
+用法: python -m cursorrules_mcp.build_cache [--rules-dir data/rules]
+
+Author: Mapoet
+Institution: NUS/STAR
+Date: 2025-01-23
+License: MIT
+"""
+
+import argparse
+import logging
+import sys
+
+from .engine import RuleEngine
+
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    """主函数"""
+    parser = argparse.ArgumentParser(description="生成YAML规则解析缓存")
+    parser.add_argument(
+        "--rules-dir",
+        default=None,
+        help="规则目录路径 (默认: 配置文件中的rules_dir)"
+    )
+    args = parser.parse_args()
+
+    engine = RuleEngine(args.rules_dir)
+    try:
+        count = engine.build_yaml_cache()
+    except Exception as e:
+        logger.error(f"生成YAML解析缓存失败: {e}")
+        sys.exit(1)
+    logger.info(f"已生成 {count} 个YAML规则文件的解析缓存: {engine.yaml_cache_dir}")
+
+
+if __name__ == "__main__":
+    main()
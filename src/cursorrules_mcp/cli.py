@@ -9,33 +9,170 @@ Date: 2025-01-23
 License: MIT
 """
 
+import ast
 import asyncio
+import functools
+import importlib
 import sys
-import json
 import argparse
 import logging
 from pathlib import Path
 from typing import List, Optional, Dict, Any
+from collections import Counter
 from datetime import datetime
 import os
 
 from .config import get_config_manager, create_default_config, ConfigManager
-from .engine import RuleEngine
-from .server import CursorRulesMCPServer
-from .validators import get_validation_manager
-from .models import SearchFilter, MCPContext
-
-# 配置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+from . import _json
+from ._eventloop import install_uvloop
+
+# 原先在模块顶层导入的名称改为首次访问时才导入（PEP 562），
+# 命令行启动和 --help 无需加载规则引擎、MCP服务器和验证器
+_LAZY_IMPORTS = {
+    "RuleEngine": ".engine",
+    "CursorRulesMCPServer": ".server",
+    "get_mcp_server": ".server",
+    "get_validation_manager": ".validators",
+    "SearchFilter": ".models",
+    "MCPContext": ".models",
+}
+
+
+def __getattr__(name: str):
+    """按需导入 _LAZY_IMPORTS 中登记的名称，保持 cursorrules_mcp.cli.<name> 的兼容访问"""
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __package__), name)
+    globals()[name] = value
+    return value
+
+
 logger = logging.getLogger(__name__)
 
+# validate_content 命令支持的输出模式（与 engine.OutputMode 的取值一致；
+# 此处不导入engine，以免构建解析器时加载规则引擎）
+_OUTPUT_MODES = ('result_only', 'result_with_prompt', 'result_with_rules', 'result_with_template', 'full')
+
+# 导入文件扩展名 -> 格式名称（用于导入摘要按格式统计）
+_EXT_TO_FORMAT: Dict[str, str] = {
+    '.md': 'Markdown',
+    '.markdown': 'Markdown',
+    '.yaml': 'YAML',
+    '.yml': 'YAML',
+    '.json': 'JSON'
+}
+
+# 测试验证工具时各语言使用的示例内容
+_TEST_CONTENT: Dict[str, str] = {
+    'python': '''def test_function():
+    x = 1
+    return x
+''',
+    'javascript': '''function testFunction() {
+    let x = 1;
+    return x;
+}
+''',
+    'markdown': '''# Test Document
+
+This is a test document.
+
+## Section
+
+Content here.
+''',
+    'cpp': '''#include <iostream>
+
+int main() {
+    std::cout << "Hello World" << std::endl;
+    return 0;
+}
+'''
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _filter_parent_parser() -> argparse.ArgumentParser:
+    """validate_content 与 stats 子命令共用的语言/领域过滤选项（只构建一次，子命令通过parents复用）"""
+    parent = argparse.ArgumentParser(add_help=False)
+    parent.add_argument('--languages', help='语言过滤，如python,markdown')
+    parent.add_argument('--domains', help='领域过滤')
+    return parent
+
+
+@functools.lru_cache(maxsize=4)
+def _engine_for(rules_dir: str):
+    """按规则目录复用规则引擎实例，同一进程内多次搜索只加载一次规则"""
+    from .engine import RuleEngine
+    return RuleEngine(rules_dir)
+
+
+def _parse_config_value(raw: str) -> Any:
+    """将命令行传入的配置值转换为布尔、数字、列表或字典，其他情况保留原字符串"""
+    lowered = raw.lower()
+    if lowered in ('true', 'false'):
+        return lowered == 'true'
+    try:
+        value = ast.literal_eval(raw)
+    except (ValueError, SyntaxError):
+        return raw
+    # 只接受数字、列表和字典字面量，避免把 "1,2" 之类的值解析为元组
+    return value if isinstance(value, (int, float, list, dict)) else raw
+
+
+@functools.lru_cache(maxsize=8)
+def _config_json(config_manager: ConfigManager, version: int) -> str:
+    """按配置版本缓存配置的JSON文本，配置未变更时重复显示无需再次转换和序列化"""
+    return _json.dumps(config_manager.to_dict(), indent=True)
+
+
+def _write_json_array(items, write=None, dump=None) -> None:
+    """将可迭代对象按缩进JSON数组格式逐项写出（与一次性序列化整个列表的输出一致）
+
+    Args:
+        items: 待序列化的对象序列
+        write: 写入函数，默认为标准输出
+        dump: 将单个对象序列化为缩进JSON文本的函数，默认为 _json.dumps(item, indent=True)
+    """
+    write = write or sys.stdout.write
+    first = True
+    for item in items:
+        write("[\n  " if first else ",\n  ")
+        text = dump(item) if dump else _json.dumps(item, indent=True)
+        write(text.replace("\n", "\n  "))
+        first = False
+    write("[]\n" if first else "\n]\n")
+
 
 class CLI:
     """命令行接口主类"""
     
+    # 子命令名称 -> 构建对应解析器的方法名（按帮助信息中的显示顺序排列）
+    _SUBCOMMAND_BUILDERS = {
+        'server': '_add_server_parser',
+        'search': '_add_search_parser',
+        'validate_content': '_add_validate_parser',
+        'config': '_add_config_parser',
+        'stats': '_add_stats_parser',
+        'test': '_add_test_parser',
+        'import': '_add_import_parser',
+    }
+    
+    # 子命令名称 -> 帮助信息
+    _SUBCOMMAND_HELP = {
+        'server': '启动MCP服务器',
+        'search': '搜索规则',
+        'validate_content': '校验内容合规性',
+        'config': '配置管理',
+        'stats': '获取规则与模板统计信息',
+        'test': '测试验证工具',
+        'import': '导入规则或模板文件',
+    }
+    
+    # 已构建的解析器（按选中的子命令缓存，None表示包含全部子命令），同一进程内多次调用时复用
+    _parsers: Dict[Optional[str], argparse.ArgumentParser] = {}
+    
     def __init__(self):
         """初始化CLI"""
         self.config_manager = get_config_manager()
@@ -50,7 +187,7 @@ class CLI:
         Returns:
             退出代码
         """
-        parser = self._create_parser()
+        parser = self._create_parser(args)
         parsed_args = parser.parse_args(args)
         
         # 设置日志级别
@@ -65,7 +202,7 @@ class CLI:
                 return await self._run_server(parsed_args)
             elif parsed_args.command == 'search':
                 return await self._search_rules(parsed_args)
-            elif parsed_args.command == 'validate':
+            elif parsed_args.command == 'validate_content':
                 return await self._validate_content(parsed_args)
             elif parsed_args.command == 'config':
                 return await self._manage_config(parsed_args)
@@ -89,8 +226,19 @@ class CLI:
                 traceback.print_exc()
             return 1
     
-    def _create_parser(self) -> argparse.ArgumentParser:
-        """创建命令行解析器"""
+    def _create_parser(self, args: Optional[List[str]] = None) -> argparse.ArgumentParser:
+        """创建命令行解析器
+        
+        Args:
+            args: 待解析的命令行参数，用于确定需要构建的子命令解析器
+        """
+        command = self._find_subcommand(args or [])
+        if command not in self._SUBCOMMAND_BUILDERS:
+            command = None
+        parser = self._parsers.get(command)
+        if parser is not None:
+            return parser
+        
         parser = argparse.ArgumentParser(
             prog='cursorrules-mcp',
             description='CursorRules-MCP 命令行工具',
@@ -111,41 +259,69 @@ class CLI:
         parser.add_argument('--quiet', '-q', action='store_true', help='静默模式')
         parser.add_argument('--version', action='version', version='cursorrules-mcp 1.0.0')
         
-        # 子命令
+        # 子命令：只构建本次调用选中的子命令解析器；未指定或无法识别时只登记名称和帮助信息，
+        # 足以输出顶层帮助和无效命令的错误提示，不构建各子命令的参数
         subparsers = parser.add_subparsers(dest='command', help='可用命令')
+        if command:
+            getattr(self, self._SUBCOMMAND_BUILDERS[command])(subparsers)
+        else:
+            for name, help_text in self._SUBCOMMAND_HELP.items():
+                subparsers.add_parser(name, help=help_text)
         
-        # 服务器命令
-        server_parser = subparsers.add_parser('server', help='启动MCP服务器')
+        self._parsers[command] = parser
+        return parser
+    
+    @staticmethod
+    def _find_subcommand(args: List[str]) -> Optional[str]:
+        """返回参数中的子命令名称；子命令之前出现帮助选项时返回None"""
+        skip_value = False
+        for arg in args:
+            if skip_value:
+                skip_value = False
+            elif arg == '--config':
+                skip_value = True
+            elif arg in ('-h', '--help'):
+                return None
+            elif not arg.startswith('-'):
+                return arg
+        return None
+    
+    def _add_server_parser(self, subparsers) -> None:
+        """服务器命令"""
+        server_parser = subparsers.add_parser('server', help=self._SUBCOMMAND_HELP['server'])
         server_parser.add_argument('--host', default='localhost', help='服务器主机地址')
         server_parser.add_argument('--port', type=int, default=8000, help='服务器端口')
         server_parser.add_argument('--reload', action='store_true', help='启用自动重载')
-        
-        # 搜索命令
-        search_parser = subparsers.add_parser('search', help='搜索规则')
+    
+    def _add_search_parser(self, subparsers) -> None:
+        """搜索命令"""
+        search_parser = subparsers.add_parser('search', help=self._SUBCOMMAND_HELP['search'])
         search_parser.add_argument('query', nargs='?', default='', help='搜索关键词')
         search_parser.add_argument('--language', '-l', action='append', help='编程语言')
         search_parser.add_argument('--domain', '-d', action='append', help='应用领域')
         search_parser.add_argument('--tag', '-t', action='append', help='标签')
         search_parser.add_argument('--limit', type=int, default=10, help='结果数量限制')
         search_parser.add_argument('--format', choices=['text', 'json'], default='text', help='输出格式')
-        
-        # 验证命令
-        validate_parser = subparsers.add_parser('validate_content', help='校验内容合规性')
+        search_parser.add_argument('--reload', action='store_true', help='重新加载规则文件')
+    
+    def _add_validate_parser(self, subparsers) -> None:
+        """验证命令"""
+        validate_parser = subparsers.add_parser('validate_content', help=self._SUBCOMMAND_HELP['validate_content'],
+                                                parents=[_filter_parent_parser()])
         validate_parser.add_argument('content', help='待校验内容')
         validate_parser.add_argument('--file_path', help='文件路径，仅用于推断语言类型')
-        validate_parser.add_argument('--languages', help='语言，如python,markdown')
         validate_parser.add_argument('--content_types', help='内容类型，如code,documentation')
-        validate_parser.add_argument('--domains', help='领域')
-        validate_parser.add_argument('--output_mode', choices=['result_only', 'result_with_prompt', 'result_with_rules', 'result_with_template', 'full'], default='result_only', help='输出模式：\n'
+        validate_parser.add_argument('--output_mode', choices=_OUTPUT_MODES, default='result_only', help='输出模式：\n'
             '  result_only: 仅返回校验结果（success, passed, problems）\n'
             '  result_with_prompt: 返回校验结果和 prompt\n'
             '  result_with_rules: 返回校验结果和规则详情\n'
             '  result_with_template: 返回校验结果和模板信息\n'
             '  full: 返回全部信息（校验结果、prompt、规则、模板信息）\n'
             '默认 result_only')
-        
-        # 配置命令
-        config_parser = subparsers.add_parser('config', help='配置管理')
+    
+    def _add_config_parser(self, subparsers) -> None:
+        """配置命令"""
+        config_parser = subparsers.add_parser('config', help=self._SUBCOMMAND_HELP['config'])
         config_subparsers = config_parser.add_subparsers(dest='config_action', help='配置操作')
         
         # 配置子命令
@@ -159,22 +335,24 @@ class CLI:
         
         config_get_parser = config_subparsers.add_parser('get', help='获取配置值')
         config_get_parser.add_argument('key', help='配置键')
-        
-        # 统计命令
-        stats_parser = subparsers.add_parser('stats', help='获取规则与模板统计信息')
+    
+    def _add_stats_parser(self, subparsers) -> None:
+        """统计命令"""
+        stats_parser = subparsers.add_parser('stats', help=self._SUBCOMMAND_HELP['stats'],
+                                             parents=[_filter_parent_parser()])
         stats_parser.add_argument('--resource_type', choices=['rules', 'templates', 'all'], default='rules', help='统计对象类型：rules（规则）、templates（模板）、all（全部）')
-        stats_parser.add_argument('--languages', help='语言过滤')
-        stats_parser.add_argument('--domains', help='领域过滤')
         stats_parser.add_argument('--rule_types', help='规则类型过滤（仅规则）')
         stats_parser.add_argument('--tags', help='标签过滤')
-        
-        # 测试命令
-        test_parser = subparsers.add_parser('test', help='测试验证工具')
+    
+    def _add_test_parser(self, subparsers) -> None:
+        """测试命令"""
+        test_parser = subparsers.add_parser('test', help=self._SUBCOMMAND_HELP['test'])
         test_parser.add_argument('--language', '-l', help='测试特定语言的工具')
         test_parser.add_argument('--tool', '-t', help='测试特定工具')
-        
-        # 导入命令
-        import_parser = subparsers.add_parser('import', help='导入规则或模板文件')
+    
+    def _add_import_parser(self, subparsers) -> None:
+        """导入命令"""
+        import_parser = subparsers.add_parser('import', help=self._SUBCOMMAND_HELP['import'])
         import_parser.add_argument('paths', nargs='+', help='要导入的文件或目录路径')
         import_parser.add_argument('--format', choices=['auto', 'markdown', 'yaml', 'json'], 
                                  default='auto', help='指定文件格式')
@@ -185,8 +363,6 @@ class CLI:
         import_parser.add_argument('--log', help='保存导入日志的文件路径')
         import_parser.add_argument('--type', choices=['rules', 'templates'], help='资源类型')
         import_parser.add_argument('--mode', choices=['append', 'replace'], help='导入模式')
-        
-        return parser
     
     async def _migrate_database(self, args) -> None:
             """执行数据库迁移"""
@@ -214,6 +390,8 @@ class CLI:
                     traceback.print_exc()    
     async def _run_server(self, args) -> int:
         """运行MCP服务器"""
+        from .server import get_mcp_server
+        
         try:
             print("🚀 启动 CursorRules-MCP 服务器...")
             
@@ -226,7 +404,7 @@ class CLI:
                 self.config.server.reload = True
             
             # 创建并启动服务器
-            server = CursorRulesMCPServer(self.config.rules_dir)
+            server = get_mcp_server(self.config.rules_dir)
             await server.run()
             
             return 0
@@ -235,62 +413,80 @@ class CLI:
             logger.error(f"服务器启动失败: {e}")
             return 1
     
+    async def _get_engine(self, reload: bool = False):
+        """获取已初始化的规则引擎
+        
+        同一规则目录复用已加载的引擎，规则文件变化或指定reload时重新加载
+        """
+        engine = _engine_for(str(self.config.rules_dir))
+        await engine.initialize()
+        if reload or engine.is_stale():
+            await engine.reload()
+        return engine
+    
     async def _search_rules(self, args) -> int:
         """搜索规则"""
+        from .models import SearchFilter
+        
         try:
-            # 初始化规则引擎
-            engine = RuleEngine(self.config.rules_dir)
-            await engine.initialize()
+            engine = await self._get_engine(reload=getattr(args, 'reload', False))
             
-            if len(engine.rules) == 0:
+            if not engine.rules:
                 print("❌ 未找到任何规则，请检查规则目录配置")
                 return 1
             
-            # 构建搜索过滤器
-            search_filter = SearchFilter(
-                query=args.query if args.query else None,
-                languages=args.language or [],
-                domains=args.domain or [],
-                tags=args.tag or [],
-                limit=args.limit
-            )
-            
-            # 执行搜索
-            results = await engine.search_rules(search_filter)
+            # 过滤条件在索引中无对应规则时直接视为无结果，无需构建过滤器和执行搜索
+            if engine.has_rules_for(languages=args.language, domains=args.domain, tags=args.tag):
+                # 构建搜索过滤器
+                search_filter = SearchFilter(
+                    query=args.query if args.query else None,
+                    languages=args.language or [],
+                    domains=args.domain or [],
+                    tags=args.tag or [],
+                    limit=args.limit
+                )
+                
+                # 执行搜索
+                results = await engine.search_rules(search_filter)
+            else:
+                results = []
             
             if args.format == 'json':
-                # JSON输出
-                output = []
-                for applicable_rule in results:
-                    rule = applicable_rule.rule
-                    output.append({
-                        'rule_id': rule.rule_id,
-                        'name': rule.name,
-                        'description': rule.description,
+                # JSON输出：逐条序列化写出，不在内存中拼装完整结果
+                _write_json_array(
+                    {
+                        'rule_id': applicable_rule.rule.rule_id,
+                        'name': applicable_rule.rule.name,
+                        'description': applicable_rule.rule.description,
                         'relevance_score': applicable_rule.relevance_score,
-                        'languages': rule.languages,
-                        'domains': rule.domains,
-                        'tags': rule.tags
-                    })
-                
-                print(json.dumps(output, ensure_ascii=False, indent=2))
+                        'languages': applicable_rule.rule.languages,
+                        'domains': applicable_rule.rule.domains,
+                        'tags': applicable_rule.rule.tags
+                    }
+                    for applicable_rule in results
+                )
             else:
                 # 文本输出
                 if not results:
                     print("❌ 未找到匹配的规则")
                     return 1
                 
-                print(f"🔍 找到 {len(results)} 条匹配规则:\n")
+                # 先拼装全部文本，最后一次性写出
+                parts: List[str] = [f"🔍 找到 {len(results)} 条匹配规则:\n\n"]
                 
                 for i, applicable_rule in enumerate(results, 1):
                     rule = applicable_rule.rule
-                    print(f"{i}. **{rule.name}** (ID: {rule.rule_id})")
-                    print(f"   相关度: {applicable_rule.relevance_score:.2f}")
-                    print(f"   描述: {rule.description}")
-                    print(f"   语言: {', '.join(rule.languages) if rule.languages else '通用'}")
-                    print(f"   领域: {', '.join(rule.domains) if rule.domains else '通用'}")
-                    print(f"   标签: {', '.join(rule.tags)}")
-                    print()
+                    parts.append(
+                        f"{i}. **{rule.name}** (ID: {rule.rule_id})\n"
+                        f"   相关度: {applicable_rule.relevance_score:.2f}\n"
+                        f"   描述: {rule.description}\n"
+                        f"   语言: {', '.join(rule.languages) if rule.languages else '通用'}\n"
+                        f"   领域: {', '.join(rule.domains) if rule.domains else '通用'}\n"
+                        f"   标签: {', '.join(rule.tags)}\n"
+                        "\n"
+                    )
+                
+                sys.stdout.write("".join(parts))
             
             return 0
             
@@ -300,116 +496,26 @@ class CLI:
     
     async def _validate_content(self, args) -> int:
         """CLI调用，参数化校验内容合规性"""
-        from src.cursorrules_mcp.engine import OutputMode
-        from src.cursorrules_mcp.models import MCPContext
-        
-        # 构建MCP上下文
-        context = MCPContext(
-            user_query="Content validation request",
-            current_file=getattr(args, 'file_path', None),
-            primary_language=getattr(args, 'languages', None),
-            domain=getattr(args, 'domains', None),
-            project_path=None
-        )
-        
-        result = await self.rule_engine.validate_content(
-            content=args.content,
-            context=context,
-            output_mode=OutputMode(args.output_mode)
-        )
-        print(json.dumps(result, ensure_ascii=False, indent=2))
-        return 0
-    
-    def _print_validation_result(self, file_path: Path, result) -> None:
-        """打印验证结果"""
-        status = "✅ 通过" if result.is_valid else "❌ 存在问题"
-        print(f"   结果: {status} (分数: {result.score:.1f}/100)")
-        
-        if result.issues:
-            print(f"   发现 {len(result.issues)} 个问题:")
-            
-            # 按严重程度分组
-            by_severity = {}
-            for issue in result.issues:
-                severity = issue.severity.value
-                if severity not in by_severity:
-                    by_severity[severity] = []
-                by_severity[severity].append(issue)
-            
-            # 显示问题
-            for severity in ['error', 'warning', 'info']:
-                if severity in by_severity:
-                    issues = by_severity[severity]
-                    icon = {'error': '🔴', 'warning': '🟡', 'info': '🔵'}[severity]
-                    print(f"     {icon} {severity.upper()} ({len(issues)}个):")
-                    
-                    for issue in issues[:5]:  # 最多显示5个
-                        location = f"{issue.line_number}:{issue.column_number}"
-                        print(f"       {location} {issue.message}")
-                    
-                    if len(issues) > 5:
-                        print(f"       ... 还有 {len(issues) - 5} 个{severity}问题")
-        
-        if result.suggestions:
-            print(f"   建议:")
-            for suggestion in result.suggestions[:3]:  # 最多显示3个建议
-                print(f"     💡 {suggestion}")
-        
-        print()
-    
-    async def _auto_fix_issues(self, file_path: Path, language: str, issues) -> None:
-        """尝试自动修复问题"""
-        if language == 'python':
-            # 尝试使用black格式化
-            try:
-                import subprocess
-                result = subprocess.run(
-                    ['black', str(file_path)],
-                    capture_output=True,
-                    text=True,
-                    timeout=30
-                )
-                
-                if result.returncode == 0:
-                    print(f"   🔧 已使用black格式化: {file_path}")
-                else:
-                    print(f"   ⚠️ black格式化失败: {result.stderr}")
-                    
-            except (subprocess.TimeoutExpired, FileNotFoundError):
-                print(f"   ⚠️ black工具不可用")
-        
-        # 可以添加其他语言的自动修复逻辑
-    
-    def _infer_language(self, file_path: Path) -> Optional[str]:
-        """推断文件的编程语言"""
-        ext = file_path.suffix.lower()
-        
-        language_map = {
-            '.py': 'python',
-            '.js': 'javascript',
-            '.jsx': 'javascript',
-            '.ts': 'typescript',
-            '.tsx': 'typescript',
-            '.cpp': 'cpp',
-            '.cc': 'cpp',
-            '.cxx': 'cpp',
-            '.c++': 'cpp',
-            '.c': 'c',
-            '.h': 'c',
-            '.hpp': 'cpp',
-            '.java': 'java',
-            '.go': 'go',
-            '.rs': 'rust',
-            '.sh': 'shell',
-            '.bash': 'shell',
-            '.md': 'markdown',
-            '.markdown': 'markdown',
-            '.yaml': 'yaml',
-            '.yml': 'yaml',
-            '.json': 'json'
-        }
+        from pydantic_core import to_jsonable_python
+        from .engine import OutputMode
         
-        return language_map.get(ext)
+        try:
+            engine = await self._get_engine()
+            result = await engine.validate_content(
+                content=args.content,
+                file_path=args.file_path or "",
+                languages=args.languages or "",
+                content_types=args.content_types or "",
+                domains=args.domains or "",
+                output_mode=OutputMode(args.output_mode)
+            )
+            # 结果中包含ValidationIssue等pydantic模型及datetime，先转换为JSON兼容类型
+            print(_json.dumps(to_jsonable_python(result), indent=True))
+            return 0
+            
+        except Exception as e:
+            logger.error(f"校验内容失败: {e}")
+            return 1
     
     async def _manage_config(self, args) -> int:
         """管理配置"""
@@ -434,18 +540,14 @@ class CLI:
                     
             elif args.config_action == 'show':
                 # 显示配置
-                print(json.dumps(self.config_manager.to_dict(), ensure_ascii=False, indent=2))
+                print(_config_json(self.config_manager, self.config_manager.version))
                 return 0
                 
             elif args.config_action == 'set':
                 # 设置配置值
                 try:
                     # 尝试将值转换为合适的类型
-                    value = args.value
-                    if value.lower() in ['true', 'false']:
-                        value = value.lower() == 'true'
-                    elif value.isdigit():
-                        value = int(value)
+                    value = _parse_config_value(args.value)
                     
                     self.config_manager.set(args.key, value)
                     self.config_manager.save()
@@ -474,18 +576,29 @@ class CLI:
     
     async def _get_statistics(self, args) -> int:
         """CLI调用，获取规则与模板统计信息"""
-        result = self.rule_engine.get_statistics(
-            resource_type=getattr(args, 'resource_type', 'rules'),
-            languages=getattr(args, 'languages', ''),
-            domains=getattr(args, 'domains', ''),
-            rule_types=getattr(args, 'rule_types', ''),
-            tags=getattr(args, 'tags', '')
-        )
-        print(json.dumps(result, ensure_ascii=False, indent=2))
+        try:
+            engine = await self._get_engine()
+            result = {}
+            if args.resource_type in ("rules", "all"):
+                result["rules_stats"] = engine.get_rule_statistics(
+                    args.languages or "", args.domains or "", args.rule_types or "", args.tags or ""
+                )
+            if args.resource_type in ("templates", "all"):
+                result["templates_stats"] = engine.get_template_statistics(
+                    args.languages or "", args.domains or "", args.tags or ""
+                )
+            result["resource_type"] = args.resource_type
+            print(_json.dumps(result, indent=True))
             return 0
+            
+        except Exception as e:
+            logger.error(f"获取统计信息失败: {e}")
+            return 1
     
     async def _test_tools(self, args) -> int:
         """测试验证工具"""
+        from .validators import get_validation_manager
+        
         try:
             validation_manager = get_validation_manager()
             available_validators = validation_manager.get_available_validators()
@@ -498,35 +611,47 @@ class CLI:
             
             languages_to_test = [args.language] if args.language else available_validators.keys()
             
+            # 先确定每种语言要测试的工具（None表示跳过该语言并输出对应提示）
+            plan = []
             for language in languages_to_test:
                 if language not in available_validators:
-                    print(f"❌ 不支持的语言: {language}")
+                    plan.append((language, None, f"❌ 不支持的语言: {language}"))
                     continue
                 
                 tools = available_validators[language]
                 if args.tool and args.tool not in tools:
-                    print(f"❌ 语言 {language} 不支持工具: {args.tool}")
+                    plan.append((language, None, f"❌ 语言 {language} 不支持工具: {args.tool}"))
                     continue
                 
-                tools_to_test = [args.tool] if args.tool else tools
+                plan.append((language, [args.tool] if args.tool else tools, None))
+            
+            # 测试内容的验证结果只与语言有关，每种语言只验证一次，各语言的验证并发执行
+            languages_to_validate = [
+                language for language, tools_to_test, _ in plan
+                if tools_to_test and any(validation_manager.is_tool_available(language, tool) for tool in tools_to_test)
+            ]
+            results = await asyncio.gather(
+                *(validation_manager.validate_content(self._get_test_content(language), language)
+                  for language in languages_to_validate),
+                return_exceptions=True
+            )
+            language_results = dict(zip(languages_to_validate, results))
+            
+            for language, tools_to_test, message in plan:
+                if tools_to_test is None:
+                    print(message)
+                    continue
                 
                 print(f"💻 {language.upper()}:")
                 
                 for tool in tools_to_test:
                     if validation_manager.is_tool_available(language, tool):
-                        # 测试工具
-                        test_content = self._get_test_content(language)
-                        
-                        try:
-                            result = await validation_manager.validate_content(
-                                test_content, language
-                            )
-                            
+                        result = language_results[language]
+                        if isinstance(result, Exception):
+                            print(f"  {tool}: ❌ 错误 ({result})")
+                        else:
                             status = "✅ 正常" if result.score > 0 else "⚠️ 有问题"
                             print(f"  {tool}: {status} (分数: {result.score:.1f})")
-                            
-                        except Exception as e:
-                            print(f"  {tool}: ❌ 错误 ({e})")
                     else:
                         print(f"  {tool}: ❌ 不可用")
                 
@@ -540,34 +665,7 @@ class CLI:
     
     def _get_test_content(self, language: str) -> str:
         """获取测试内容"""
-        test_contents = {
-            'python': '''def test_function():
-    x = 1
-    return x
-''',
-            'javascript': '''function testFunction() {
-    let x = 1;
-    return x;
-}
-''',
-            'markdown': '''# Test Document
-
-This is a test document.
-
-## Section
-
-Content here.
-''',
-            'cpp': '''#include <iostream>
-
-int main() {
-    std::cout << "Hello World" << std::endl;
-    return 0;
-}
-'''
-        }
-        
-        return test_contents.get(language, '// Test content')
+        return _TEST_CONTENT.get(language, '// Test content')
 
     async def _import_resources(self, args) -> int:
         """导入规则或模板文件"""
@@ -591,8 +689,8 @@ int main() {
                 engine.load_prompt_templates(args.paths, mode=getattr(args, 'mode', 'append'))
                 print(f"✅ 成功导入 {len(args.paths)} 个模板文件")
                 return 0
-            else:
-                # 导入规则
+            
+            # 导入规则
             importer = UnifiedRuleImporter(save_to_database=True)
             rules = await importer.import_rules_async(
                 paths=args.paths,
@@ -609,76 +707,61 @@ int main() {
                 output_dir.mkdir(parents=True, exist_ok=True)
                 
                 # 保存为JSON格式
+                # 逐条规则由pydantic直接序列化写入，不构造中间字典
                 output_file = output_dir / "imported_rules.json"
-                rules_data = [rule.dict() for rule in rules]
-                
                 with open(output_file, 'w', encoding='utf-8') as f:
-                    import json
-                    json.dump(rules_data, f, indent=2, ensure_ascii=False, default=str)
+                    _write_json_array(rules, f.write, dump=lambda rule: rule.model_dump_json(indent=2))
                 
                 print(f"💾 规则已保存到: {output_file}")
             
             # 如果启用验证，验证导入的规则
             if args.validate:
-                print("🔍 正在验证导入的规则...")
-                
-                valid_count = 0
-                invalid_count = 0
+                # 简单验证：检查必需字段；通过的规则只计数，失败的规则最多列出前10条
+                invalid_ids = [rule.rule_id for rule in rules if not (rule.rule_id and rule.name and rule.rules)]
                 
-                for rule in rules:
-                    try:
-                        # 简单验证：检查必需字段
-                        if not rule.rule_id or not rule.name or not rule.rules:
-                            print(f"❌ 规则验证失败: {rule.rule_id} - 缺少必需字段")
-                            invalid_count += 1
-                        else:
-                            print(f"✅ 规则验证通过: {rule.rule_id}")
-                            valid_count += 1
-                    except Exception as e:
-                        print(f"❌ 规则验证失败: {rule.rule_id} - {e}")
-                        invalid_count += 1
-                
-                print(f"📊 验证结果: 通过 {valid_count} 条，失败 {invalid_count} 条")
+                lines = ["🔍 正在验证导入的规则..."]
+                lines.extend(f"❌ 规则验证失败: {rule_id} - 缺少必需字段" for rule_id in invalid_ids[:10])
+                if len(invalid_ids) > 10:
+                    lines.append(f"   ... 还有 {len(invalid_ids) - 10} 条规则验证失败")
+                lines.append(f"📊 验证结果: 通过 {len(rules) - len(invalid_ids)} 条，失败 {len(invalid_ids)} 条")
+                sys.stdout.write("\n".join(lines) + "\n")
             
             # 显示导入摘要
             summary = importer.get_import_summary()
             
-            print("\n" + "="*60)
-            print("📊 导入摘要:")
-            print(f"  总文件数: {summary['total_files']}")
-            print(f"  成功导入: {summary['successful_imports']}")
-            print(f"  导入失败: {summary['failed_imports']}")
-            print(f"  成功率: {summary['success_rate']:.1%}")
-            print(f"  总规则数: {len(rules)}")
+            # 摘要各行先拼装，再一次性写出
+            lines = [
+                "",
+                "="*60,
+                "📊 导入摘要:",
+                f"  总文件数: {summary['total_files']}",
+                f"  成功导入: {summary['successful_imports']}",
+                f"  导入失败: {summary['failed_imports']}",
+                f"  成功率: {summary['success_rate']:.1%}",
+                f"  总规则数: {len(rules)}",
+            ]
             
             # 按格式统计
-            format_stats = {}
-            for log_entry in summary['import_log']:
-                if log_entry['status'] == 'success':
-                    file_path = Path(log_entry['file'])
-                    ext = file_path.suffix.lower()
-                    format_name = {
-                        '.md': 'Markdown',
-                        '.markdown': 'Markdown', 
-                        '.yaml': 'YAML',
-                        '.yml': 'YAML',
-                        '.json': 'JSON'
-                    }.get(ext, 'Unknown')
-                    
-                    format_stats[format_name] = format_stats.get(format_name, 0) + 1
+            format_stats = Counter(
+                _EXT_TO_FORMAT.get(os.path.splitext(log_entry['file'])[1].lower(), 'Unknown')
+                for log_entry in summary['import_log']
+                if log_entry['status'] == 'success'
+            )
             
             if format_stats:
-                print("\n📁 按格式统计:")
-                for format_name, count in format_stats.items():
-                    print(f"  {format_name}: {count} 个文件")
+                lines.append("\n📁 按格式统计:")
+                lines.extend(f"  {format_name}: {count} 个文件" for format_name, count in format_stats.items())
+            
+            sys.stdout.write("\n".join(lines) + "\n")
             
             # 保存导入日志
+            tail = ""
             if args.log:
                 log_path = Path(args.log)
                 importer.save_import_log(log_path)
-                print(f"📝 导入日志已保存: {log_path}")
+                tail = f"📝 导入日志已保存: {log_path}\n"
             
-            print(f"\n🔄 规则已保存到数据库，下次搜索将包含新导入的规则")
+            sys.stdout.write(f"{tail}\n🔄 规则已保存到数据库，下次搜索将包含新导入的规则\n")
             
             return 0 if summary['failed_imports'] == 0 else 1
             
@@ -696,8 +779,24 @@ async def main() -> int:
     return await cli.run(sys.argv[1:])
 
 
+def _configure_logging(argv: List[str]) -> None:
+    """在解析参数前根据 --verbose/--quiet 配置日志，避免导入模块时就以INFO级别配置日志"""
+    if any(arg in argv for arg in ('--verbose', '-v')):
+        level = logging.DEBUG
+    elif any(arg in argv for arg in ('--quiet', '-q')):
+        level = logging.WARNING
+    else:
+        level = logging.INFO
+    logging.basicConfig(
+        level=level,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+
 def sync_main() -> int:
     """同步主入口函数"""
+    _configure_logging(sys.argv[1:])
+    install_uvloop()
     return asyncio.run(main())
 
 
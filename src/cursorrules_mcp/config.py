@@ -9,14 +9,14 @@ Date: 2025-01-23
 License: MIT
 """
 
+import functools
 import json
+import operator
 import os
 from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
-from typing import Any, Dict, List, Optional
-
-import yaml
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 try:
     from pydantic import BaseModel, Field, validator
@@ -98,8 +98,8 @@ class ValidationConfig(BaseModel):
     parallel_validation: bool = Field(default=True, description="是否并行验证")
     max_workers: int = Field(default=4, description="最大工作线程数")
     timeout: int = Field(default=60, description="验证超时时间（秒）")
-    tools: Dict[str, ValidationToolConfig] = Field(
-        default_factory=dict, description="验证工具配置"
+    tools: Dict[str, Dict[str, ValidationToolConfig]] = Field(
+        default_factory=dict, description="验证工具配置（语言 -> 工具名称 -> 工具配置）"
     )
 
 
@@ -170,9 +170,119 @@ class CursorRulesConfig(BaseModel):
         use_enum_values = True
 
 
+# 默认验证工具配置：语言 -> 工具名称 -> 工具配置（模块导入时构建一次）
+_DEFAULT_VALIDATION_TOOLS: Dict[str, Dict[str, ValidationToolConfig]] = {
+    "python": {
+        "flake8": ValidationToolConfig(
+            name="flake8",
+            command="flake8",
+            args=["--max-line-length=79", "--ignore=E203,W503"],
+        ),
+        "pylint": ValidationToolConfig(
+            name="pylint", command="pylint", args=["--disable=C0103,C0114"]
+        ),
+        "black": ValidationToolConfig(
+            name="black", command="black", args=["--check", "--diff"]
+        ),
+        "mypy": ValidationToolConfig(
+            name="mypy", command="mypy", args=["--ignore-missing-imports"]
+        ),
+    },
+    "javascript": {
+        "eslint": ValidationToolConfig(
+            name="eslint", command="eslint", args=["--format=json"]
+        ),
+        "prettier": ValidationToolConfig(
+            name="prettier", command="prettier", args=["--check"]
+        ),
+    },
+    "cpp": {
+        "cppcheck": ValidationToolConfig(
+            name="cppcheck", command="cppcheck", args=["--enable=all", "--xml"]
+        ),
+        "clang-tidy": ValidationToolConfig(
+            name="clang-tidy", command="clang-tidy", args=["-checks=*"]
+        ),
+    },
+    "markdown": {
+        "markdownlint": ValidationToolConfig(
+            name="markdownlint", command="markdownlint", args=["--json"]
+        )
+    },
+}
+
+
+def _env_bool(value: str) -> bool:
+    """解析布尔型环境变量"""
+    return value.lower() in ("true", "1", "yes", "on")
+
+
+# 环境变量覆盖：(环境变量名, 配置路径各级属性名, 类型转换函数)
+_ENV_OVERRIDES = (
+    ("CURSORRULES_DEBUG", ("debug",), _env_bool),
+    ("CURSORRULES_RULES_DIR", ("rules_dir",), str),
+    ("CURSORRULES_TEMPLATES_DIR", ("templates_dir",), str),
+    ("CURSORRULES_LOG_LEVEL", ("server", "log_level"), str),
+    ("CURSORRULES_PORT", ("server", "port"), int),
+    ("CURSORRULES_HOST", ("server", "host"), str),
+    ("CURSORRULES_CACHE_TYPE", ("cache", "type"), str),
+    ("CURSORRULES_REDIS_URL", ("cache", "redis_url"), str),
+    ("CURSORRULES_DATABASE_URL", ("database", "type"), str),
+)
+
+
+@functools.lru_cache(maxsize=256)
+def _config_getter(key: str) -> Callable[[Any], Any]:
+    """点号分隔配置键对应的属性读取函数（按键缓存）"""
+    return operator.attrgetter(key)
+
+
+@functools.lru_cache(maxsize=256)
+def _config_key_parts(key: str) -> Tuple[str, ...]:
+    """点号分隔配置键拆分后的各级属性名（按键缓存）"""
+    return tuple(key.split("."))
+
+
+@functools.lru_cache(maxsize=None)
+def _yaml_codecs():
+    """按需导入yaml（只使用JSON配置时无需加载），返回 (yaml模块, 安全加载器, 安全输出器)
+
+    优先使用LibYAML C扩展的安全加载器/输出器，不可用时回退到纯Python实现
+    """
+    import yaml
+
+    try:
+        from yaml import CSafeLoader as YamlSafeLoader, CSafeDumper as YamlSafeDumper
+    except ImportError:
+        from yaml import SafeLoader as YamlSafeLoader, SafeDumper as YamlSafeDumper
+    return yaml, YamlSafeLoader, YamlSafeDumper
+
+
+@functools.lru_cache(maxsize=32)
+def _parse_config_file(path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """读取并解析配置文件
+
+    以（路径、修改时间、大小）为缓存键，文件未变化时重复加载直接复用解析结果，
+    文件修改后缓存键随之变化，自动重新解析。返回的字典为共享对象，调用方不应修改。
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".json"):
+            return json.load(f)
+        yaml, yaml_loader, _ = _yaml_codecs()
+        return yaml.load(f, Loader=yaml_loader)
+
+
+def clear_config_cache() -> None:
+    """清空配置文件解析缓存"""
+    _parse_config_file.cache_clear()
+
+
 class ConfigManager:
     """配置管理器"""
 
+    # 本进程内已确认存在的目录，重复加载配置时不再检查
+    _ensured_dirs: Set[str] = set()
+
     def __init__(self, config_file: Optional[str] = None):
         """初始化配置管理器
 
@@ -182,37 +292,56 @@ class ConfigManager:
         self.config_file = config_file or self._find_config_file()
         self.config: CursorRulesConfig = CursorRulesConfig()
         self.loaded = False
+        # 配置版本号：配置内容每次变更时递增，供按版本缓存的派生结果判断是否过期
+        self.version = 0
+        # 上次加载时配置文件的修改时间（纳秒），用于判断配置文件是否已被修改
+        self._loaded_mtime: Optional[int] = None
 
     def _find_config_file(self) -> Optional[str]:
         """查找配置文件"""
         # 查找顺序：环境变量 -> 当前目录 -> 用户目录 -> 系统目录
-        search_paths = [
-            os.environ.get("CURSORRULES_CONFIG"),
+        env_path = os.environ.get("CURSORRULES_CONFIG")
+        if env_path and os.path.isfile(env_path):
+            return env_path
+
+        home = os.path.expanduser("~")
+        search_paths = (
             "cursorrules.yaml",
             "cursorrules.yml",
             "cursorrules.json",
-            Path.home() / ".cursorrules.yaml",
-            Path.home() / ".cursorrules.yml",
-            Path.home() / ".cursorrules.json",
+            os.path.join(home, ".cursorrules.yaml"),
+            os.path.join(home, ".cursorrules.yml"),
+            os.path.join(home, ".cursorrules.json"),
             "/etc/cursorrules/config.yaml",
             "/etc/cursorrules/config.yml",
-        ]
+        )
 
         for path in search_paths:
-            if path and Path(path).exists():
-                return str(path)
+            if os.path.isfile(path):
+                return path
 
         return None
 
+    def _config_file_mtime(self) -> Optional[int]:
+        """配置文件的修改时间（纳秒），文件不存在时返回None"""
+        if not self.config_file:
+            return None
+        try:
+            return os.stat(self.config_file).st_mtime_ns
+        except OSError:
+            return None
+
+    def is_stale(self) -> bool:
+        """已加载的配置是否过期（加载后配置文件被修改、新建或删除）"""
+        return self._loaded_mtime != self._config_file_mtime()
+
     def load(self) -> None:
         """加载配置"""
+        self._loaded_mtime = self._config_file_mtime()
         if self.config_file and Path(self.config_file).exists():
             try:
-                with open(self.config_file, "r", encoding="utf-8") as f:
-                    if self.config_file.endswith(".json"):
-                        data = json.load(f)
-                    else:
-                        data = yaml.safe_load(f)
+                stat = os.stat(self.config_file)
+                data = _parse_config_file(self.config_file, stat.st_mtime_ns, stat.st_size)
 
                 # 合并配置
                 self.config = CursorRulesConfig(**data)
@@ -233,45 +362,26 @@ class ConfigManager:
 
         # 初始化验证工具配置
         self._init_validation_tools()
+        self.version += 1
 
     def _apply_env_overrides(self) -> None:
         """应用环境变量覆盖"""
-        env_mappings = {
-            "CURSORRULES_DEBUG": ("debug", bool),
-            "CURSORRULES_RULES_DIR": ("rules_dir", str),
-            "CURSORRULES_TEMPLATES_DIR": ("templates_dir", str),
-            "CURSORRULES_LOG_LEVEL": ("server.log_level", str),
-            "CURSORRULES_PORT": ("server.port", int),
-            "CURSORRULES_HOST": ("server.host", str),
-            "CURSORRULES_CACHE_TYPE": ("cache.type", str),
-            "CURSORRULES_REDIS_URL": ("cache.redis_url", str),
-            "CURSORRULES_DATABASE_URL": ("database.type", str),
-        }
-
-        for env_var, (config_path, value_type) in env_mappings.items():
+        for env_var, keys, convert in _ENV_OVERRIDES:
             env_value = os.environ.get(env_var)
-            if env_value:
-                try:
-                    # 解析嵌套配置路径
-                    config_obj = self.config
-                    keys = config_path.split(".")
-
-                    for key in keys[:-1]:
-                        config_obj = getattr(config_obj, key)
-
-                    # 类型转换
-                    if value_type == bool:
-                        parsed_value = env_value.lower() in ("true", "1", "yes", "on")
-                    elif value_type == int:
-                        parsed_value = int(env_value)
-                    else:
-                        parsed_value = env_value
+            if not env_value:
+                continue
+            try:
+                # 解析嵌套配置路径
+                config_obj = self.config
+                for key in keys[:-1]:
+                    config_obj = getattr(config_obj, key)
 
-                    setattr(config_obj, keys[-1], parsed_value)
-                    print(f"🔧 环境变量覆盖: {config_path} = {parsed_value}")
+                parsed_value = convert(env_value)
+                setattr(config_obj, keys[-1], parsed_value)
+                print(f"🔧 环境变量覆盖: {'.'.join(keys)} = {parsed_value}")
 
-                except Exception as e:
-                    print(f"⚠️ 环境变量 {env_var} 解析失败: {e}")
+            except Exception as e:
+                print(f"⚠️ 环境变量 {env_var} 解析失败: {e}")
 
     def _ensure_directories(self) -> None:
         """确保必要目录存在"""
@@ -283,61 +393,23 @@ class ConfigManager:
         ]
 
         for directory in directories:
-            path = Path(directory)
-            if not path.exists():
-                path.mkdir(parents=True, exist_ok=True)
+            key = os.path.abspath(directory)
+            if key in self._ensured_dirs:
+                continue
+            if not os.path.exists(key):
+                os.makedirs(key, exist_ok=True)
                 print(f"📁 创建目录: {directory}")
+            self._ensured_dirs.add(key)
 
     def _init_validation_tools(self) -> None:
         """初始化验证工具配置"""
-        default_tools = {
-            "python": {
-                "flake8": ValidationToolConfig(
-                    name="flake8",
-                    command="flake8",
-                    args=["--max-line-length=79", "--ignore=E203,W503"],
-                ),
-                "pylint": ValidationToolConfig(
-                    name="pylint", command="pylint", args=["--disable=C0103,C0114"]
-                ),
-                "black": ValidationToolConfig(
-                    name="black", command="black", args=["--check", "--diff"]
-                ),
-                "mypy": ValidationToolConfig(
-                    name="mypy", command="mypy", args=["--ignore-missing-imports"]
-                ),
-            },
-            "javascript": {
-                "eslint": ValidationToolConfig(
-                    name="eslint", command="eslint", args=["--format=json"]
-                ),
-                "prettier": ValidationToolConfig(
-                    name="prettier", command="prettier", args=["--check"]
-                ),
-            },
-            "cpp": {
-                "cppcheck": ValidationToolConfig(
-                    name="cppcheck", command="cppcheck", args=["--enable=all", "--xml"]
-                ),
-                "clang-tidy": ValidationToolConfig(
-                    name="clang-tidy", command="clang-tidy", args=["-checks=*"]
-                ),
-            },
-            "markdown": {
-                "markdownlint": ValidationToolConfig(
-                    name="markdownlint", command="markdownlint", args=["--json"]
-                )
-            },
-        }
-
-        # 只添加未配置的工具
-        for language, tools in default_tools.items():
-            if language not in self.config.validation.tools:
-                self.config.validation.tools[language] = {}
-
+        configured = self.config.validation.tools
+        # 只添加未配置的工具（复制默认配置，避免多个配置实例共享同一对象）
+        for language, tools in _DEFAULT_VALIDATION_TOOLS.items():
+            language_tools = configured.setdefault(language, {})
             for tool_name, tool_config in tools.items():
-                if tool_name not in self.config.validation.tools[language]:
-                    self.config.validation.tools[language][tool_name] = tool_config
+                if tool_name not in language_tools:
+                    language_tools[tool_name] = tool_config.model_copy(deep=True)
 
     def save(self, file_path: Optional[str] = None) -> None:
         """保存配置到文件
@@ -348,14 +420,20 @@ class ConfigManager:
         save_path = file_path or self.config_file or "cursorrules.yaml"
 
         try:
-            config_dict = self.config.dict()
+            # 枚举等值转换为JSON兼容类型，保存的YAML可被安全加载器重新读取
+            config_dict = self.config.model_dump(mode="json")
 
             with open(save_path, "w", encoding="utf-8") as f:
                 if save_path.endswith(".json"):
                     json.dump(config_dict, f, ensure_ascii=False, indent=2)
                 else:
+                    yaml, _, yaml_dumper = _yaml_codecs()
                     yaml.dump(
-                        config_dict, f, default_flow_style=False, allow_unicode=True
+                        config_dict,
+                        f,
+                        Dumper=yaml_dumper,
+                        default_flow_style=False,
+                        allow_unicode=True,
                     )
 
             print(f"✅ 配置已保存到 {save_path}")
@@ -374,10 +452,7 @@ class ConfigManager:
             配置值
         """
         try:
-            value = self.config
-            for part in key.split("."):
-                value = getattr(value, part)
-            return value
+            return _config_getter(key)(self.config)
         except (AttributeError, KeyError):
             return default
 
@@ -390,12 +465,13 @@ class ConfigManager:
         """
         try:
             obj = self.config
-            keys = key.split(".")
+            keys = _config_key_parts(key)
 
             for part in keys[:-1]:
                 obj = getattr(obj, part)
 
             setattr(obj, keys[-1], value)
+            self.version += 1
 
         except (AttributeError, KeyError) as e:
             raise ValueError(f"无效的配置键: {key}") from e
@@ -439,6 +515,7 @@ class ConfigManager:
                         setattr(obj, key, value)
 
         update_nested(self.config, updates)
+        self.version += 1
 
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典格式
@@ -496,7 +573,7 @@ def get_config(config_path: str = None):
     import os
     import re
 
-    import yaml
+    yaml, yaml_loader, _ = _yaml_codecs()
 
     if not config_path:
         config_path = os.environ.get("CURSORRULES_CONFIG", "configs/cursorrules.yaml")
@@ -509,7 +586,7 @@ def get_config(config_path: str = None):
             raise RuntimeError(
                 f"配置文件 {config_path} 包含不支持的 YAML tag，请用文本编辑器清理！"
             )
-        data = yaml.safe_load(content)
+        data = yaml.load(content, Loader=yaml_loader)
     config = CursorRulesConfig()
 
     # 递归赋值
@@ -543,6 +620,9 @@ def get_config_manager() -> ConfigManager:
     if _config_manager is None:
         _config_manager = ConfigManager()
         _config_manager.load()
+    elif _config_manager.is_stale():
+        # 配置文件在加载后被修改，重新加载（未修改时直接复用已解析的配置）
+        _config_manager.load()
 
     return _config_manager
 
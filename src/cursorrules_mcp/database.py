@@ -19,8 +19,15 @@ import os
 import yaml
 from packaging import version
 
+# 优先使用LibYAML C扩展的安全加载器，不可用时回退到纯Python实现
+try:
+    from yaml import CSafeLoader as YamlSafeLoader
+except ImportError:
+    from yaml import SafeLoader as YamlSafeLoader
+
 from .config import get_config
 from .models import CursorRule, RuleType, ValidationSeverity
+from . import _json
 
 logger = logging.getLogger(__name__)
 
@@ -231,8 +238,8 @@ class RuleDatabase:
                 if file.endswith('.json'):
                     file_path = os.path.join(root, file)
                     try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            rules_data = json.load(f)
+                        with open(file_path, 'rb') as f:
+                            rules_data = _json.loads(f.read())
                             if isinstance(rules_data, list):
                                 for rule_data in rules_data:
                                     rule = CursorRule(**rule_data)
@@ -283,6 +290,10 @@ class RuleDatabase:
                     self.rule_index["tags"][tag] = set()
                 self.rule_index["tags"][tag].add(rule_id)
 
+    async def rebuild_indexes(self) -> None:
+        """重建搜索索引，用于批量添加规则之后"""
+        await self._build_indexes()
+
     async def _detect_all_conflicts(self) -> None:
         """检测所有规则冲突"""
         all_rules = list(self.rules.values())
@@ -327,9 +338,15 @@ class RuleDatabase:
         return [self.rules[rid] for rid in rule_ids if rid in self.rules]
 
     async def add_rule(
-        self, rule: CursorRule, file_path: Optional[Path] = None
+        self, rule: CursorRule, file_path: Optional[Path] = None, rebuild_index: bool = True
     ) -> bool:
-        """添加新规则"""
+        """添加新规则
+
+        Args:
+            rule: 规则对象
+            file_path: 保存路径，提供时将规则写入文件
+            rebuild_index: 是否立即重建索引；批量导入时传入False，导入结束后调用rebuild_indexes统一重建
+        """
         # 检测冲突
         conflicts = self.conflict_detector.detect_conflicts(
             rule, list(self.rules.values())
@@ -347,7 +364,8 @@ class RuleDatabase:
             self.rules[rule.rule_id] = rule
 
         # 重建索引
-        await self._build_indexes()
+        if rebuild_index:
+            await self._build_indexes()
 
         # 保存到文件
         if file_path:
@@ -373,6 +391,34 @@ class RuleDatabase:
 
         return await self.add_rule(rule)
 
+    async def upsert_rules(self, rules: List[CursorRule], save: bool = False) -> Tuple[int, int]:
+        """批量添加规则，rule_id已存在时覆盖；全部写入后只重建一次索引
+
+        Args:
+            rules: 规则列表
+            save: 是否将规则写入文件
+
+        Returns:
+            (新增数量, 覆盖数量)
+        """
+        added = updated = 0
+        for rule in rules:
+            exists = rule.rule_id in self.rules
+            try:
+                if not await self.add_rule(rule, self._get_rule_file_path(rule) if save else None,
+                                           rebuild_index=False):
+                    continue
+            except Exception as e:
+                logger.error(f"保存规则失败 {rule.rule_id}: {e}")
+                continue
+            if exists:
+                updated += 1
+            else:
+                added += 1
+
+        await self.rebuild_indexes()
+        return added, updated
+
     def save_rule(self, rule: CursorRule, merge: bool = False, append_mode: bool = False) -> None:
         """
         保存规则到文件系统
@@ -390,7 +436,7 @@ class RuleDatabase:
             existing_content = None
             if append_mode and file_path.exists():
                 with open(file_path, 'r', encoding='utf-8') as f:
-                    existing_content = yaml.safe_load(f)
+                    existing_content = yaml.load(f, Loader=YamlSafeLoader)
 
             # 转换规则为字典
             rule_dict = self._convert_rule_for_serialization(rule)
@@ -575,6 +621,7 @@ class RuleDatabase:
 
         # 计算基本统计
         active_rules = [r for r in filtered_rules if r.active]
+        filtered_ids = {r.rule_id for r in filtered_rules}
         total_versions = sum(
             len(versions) for versions in self.version_manager.version_history.values()
         )
@@ -636,7 +683,7 @@ class RuleDatabase:
             "version_distribution": {
                 rule_id: len(versions)
                 for rule_id, versions in self.version_manager.version_history.items()
-                if rule_id in [r.rule_id for r in filtered_rules]
+                if rule_id in filtered_ids
             },
             "rules_by_type": rules_by_type,
             "rules_by_language": rules_by_language,
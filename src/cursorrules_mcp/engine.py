@@ -10,15 +10,29 @@ License: MIT
 """
 
 import asyncio
-import json
+import functools
+import hashlib
+import os
+import heapq
 import logging
+import mmap
+import pickle
+import struct
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Set, Tuple
+from typing import List, Dict, Any, Optional, Set, Tuple, FrozenSet
 from datetime import datetime
 import re
 import yaml
+import numpy as np
 from enum import Enum
 
+# 优先使用LibYAML C扩展的安全加载器，不可用时回退到纯Python实现
+try:
+    from yaml import CSafeLoader as YamlSafeLoader
+except ImportError:
+    from yaml import SafeLoader as YamlSafeLoader
+
 from .models import (
     CursorRule, RuleType, ContentType, TaskType, ValidationSeverity,
     RuleCondition, RuleApplication, RuleValidation, MCPContext,
@@ -30,8 +44,13 @@ from .models import (
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+if not yaml.__with_libyaml__:
+    logger.warning("PyYAML未编译LibYAML C扩展，YAML规则解析将使用较慢的纯Python实现")
+
 # 导入数据库模块
 from .database import get_rule_database, initialize_rule_database
+from ._fastval import find_long_lines, PatternScanner
+from . import _json
 
 class PromptTemplate:
     """可扩展的Prompt模板，支持领域/语言/内容类型等元数据和模板内容。"""
@@ -55,7 +74,7 @@ def import_prompt_templates_from_file(file_path):
     templates = []
     with open(file_path, 'r', encoding='utf-8') as f:
         if file_path.endswith('.yaml') or file_path.endswith('.yml'):
-            data = yaml.safe_load(f)
+            data = yaml.load(f, Loader=YamlSafeLoader)
             for item in data.get('templates', []):
                 templates.append(PromptTemplate(
                     template_id=item.get('template_id', ''),
@@ -80,6 +99,172 @@ def import_prompt_templates_from_file(file_path):
                 ))
     return templates
 
+# 可用标签的分类（按展示顺序）
+_TAG_CATEGORIES: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("编程语言", ("python", "cpp", "fortran", "shell", "javascript", "typescript", "java", "go")),
+    ("领域", ("meteorology", "ionosphere", "surveying", "oceanography", "geophysics", "astronomy")),
+    ("任务类型", ("coding", "documentation", "analysis", "visualization", "testing")),
+    ("质量类型", ("style", "performance", "security", "readability", "maintainability")),
+    ("内容类型", ("code", "documentation", "data_interface", "algorithm", "configuration")),
+)
+_CATEGORIZED_TAGS: FrozenSet[str] = frozenset(tag for _, tags in _TAG_CATEGORIES for tag in tags)
+
+# 规则文件总大小达到该阈值且多于一个文件时，才使用多进程并行解码
+_PARALLEL_DECODE_MIN_BYTES = 1 << 20
+# 并行解码时每个任务最多包含的文件数，小文件成批提交以减少进程间往返
+_PARALLEL_DECODE_CHUNK = 16
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_filter_param(spec: str) -> Tuple[str, ...]:
+    """拆分逗号分隔的过滤参数并去除空白（结果缓存，重复的过滤参数直接命中）"""
+    return tuple(item.strip() for item in spec.split(',') if item.strip())
+
+
+@functools.lru_cache(maxsize=4096)
+def _filter_set(spec: str, lower: bool = False) -> FrozenSet[str]:
+    """将逗号分隔的过滤参数解析为集合，可选转为小写"""
+    items = parse_filter_param(spec)
+    return frozenset(item.lower() for item in items) if lower else frozenset(items)
+
+
+def _yaml_cache_file(file_path: str, cache_dir: str) -> str:
+    """YAML解析缓存文件路径，以（绝对路径、修改时间、大小）为键，源文件变化后自动失效"""
+    stat = os.stat(file_path)
+    key = f"{os.path.abspath(file_path)}|{stat.st_mtime_ns}|{stat.st_size}"
+    return os.path.join(cache_dir, hashlib.sha1(key.encode('utf-8')).hexdigest() + ".pkl")
+
+
+@functools.lru_cache(maxsize=None)
+def _private_cache_dir(path: str) -> Optional[str]:
+    """创建并校验只有当前用户可写的缓存目录
+    
+    缓存以pickle保存，只能从他人无法写入的目录读取；目录不属于当前用户或可被组/其他用户写入时返回None，
+    调用方应放弃使用缓存。
+    """
+    try:
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        stat = os.stat(path)
+    except OSError as e:
+        logger.warning(f"创建规则缓存目录失败 {path}: {e}")
+        return None
+    if (hasattr(os, 'getuid') and stat.st_uid != os.getuid()) or stat.st_mode & 0o022:
+        logger.warning(f"规则缓存目录不属于当前用户或可被他人写入，已禁用缓存: {path}")
+        return None
+    return path
+
+
+def _decode_rule_file(file_path: str, cache_dir: Optional[str] = None) -> Any:
+    """解码单个规则文件（JSON或YAML），返回原始数据，供进程池调用
+    
+    指定cache_dir时，YAML文件的解析结果以pickle缓存，源文件未变化时直接读取缓存；
+    cache_dir必须是经_private_cache_dir校验的用户私有目录。
+    """
+    if file_path.endswith('.json'):
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+        return _json.loads(raw)
+    
+    cache_file = None
+    if cache_dir is not None:
+        cache_file = _yaml_cache_file(file_path, cache_dir)
+        try:
+            with open(cache_file, 'rb') as f:
+                return pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            pass
+    
+    with open(file_path, 'r', encoding='utf-8') as f:
+        data = yaml.load(f, Loader=YamlSafeLoader)
+    
+    if cache_file is not None:
+        # 先写临时文件再原子替换，避免并发读取到不完整的缓存
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+            with open(tmp_file, 'wb') as f:
+                pickle.dump(data, f, protocol=5)
+            os.replace(tmp_file, cache_file)
+        except OSError as e:
+            logger.warning(f"写入YAML解析缓存失败 {file_path}: {e}")
+    return data
+
+
+def _decode_rule_batch(file_paths: List[str], cache_dir: Optional[str] = None) -> List[Any]:
+    """在工作进程中依次解码一批规则文件，单个文件失败时在对应位置返回异常"""
+    results = []
+    for file_path in file_paths:
+        try:
+            results.append(_decode_rule_file(file_path, cache_dir))
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+_SNAPSHOT_MAGIC = b"CRSNAP05"
+_SNAPSHOT_ALIGN = 64
+
+
+def _write_snapshot(path: Path, obj: Any) -> None:
+    """将对象写入快照文件，numpy数组以带外缓冲区形式按64字节对齐追加在文件尾部
+    
+    文件布局: 魔数 | 载荷长度 | 缓冲区数量 | (偏移, 长度)* | pickle载荷 | 缓冲区数据
+    """
+    buffers: List[pickle.PickleBuffer] = []
+    payload = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+    raws = [buf.raw() for buf in buffers]
+    
+    header_size = len(_SNAPSHOT_MAGIC) + 16 + 16 * len(raws)
+    offset = header_size + len(payload)
+    table = []
+    for raw in raws:
+        offset += -offset % _SNAPSHOT_ALIGN
+        table.append((offset, raw.nbytes))
+        offset += raw.nbytes
+    
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(_SNAPSHOT_MAGIC)
+        f.write(struct.pack("<QQ", len(payload), len(raws)))
+        for item in table:
+            f.write(struct.pack("<QQ", *item))
+        f.write(payload)
+        for (start, _), raw in zip(table, raws):
+            f.write(b"\0" * (start - f.tell()))
+            f.write(raw)
+    tmp_path.replace(path)
+
+
+def _read_snapshot(path: Path) -> Any:
+    """以只读mmap方式读取快照，numpy数组直接引用映射内存（多进程共享页缓存）"""
+    with open(path, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mm)
+    if bytes(view[:len(_SNAPSHOT_MAGIC)]) != _SNAPSHOT_MAGIC:
+        raise ValueError(f"无效的规则快照文件: {path}")
+    pos = len(_SNAPSHOT_MAGIC)
+    payload_size, buffer_count = struct.unpack_from("<QQ", view, pos)
+    pos += 16
+    buffers = []
+    for _ in range(buffer_count):
+        start, size = struct.unpack_from("<QQ", view, pos)
+        pos += 16
+        buffers.append(view[start:start + size])
+    return pickle.loads(view[pos:pos + payload_size], buffers=buffers)
+
+
+def _pack_bitsets(index: Dict[str, np.ndarray], size: int) -> Tuple[Dict[str, int], np.ndarray]:
+    """将倒排索引打包为按规则位置排列的uint64位集矩阵
+    
+    每个键分配一个位编号，矩阵第i行第w列的第b位表示规则i包含第w*64+b号键；
+    键数量不超过64时每条规则只占一个字。
+    """
+    bit_of = {key: bit for bit, key in enumerate(sorted(index))}
+    words = np.zeros((size, max(1, -(-len(bit_of) // 64))), dtype=np.uint64)
+    for key, bit in bit_of.items():
+        words[index[key], bit >> 6] |= np.uint64(1 << (bit & 63))
+    return bit_of, words
+
 class OutputMode(Enum):
     RESULT_ONLY = 'result_only'
     RESULT_WITH_PROMPT = 'result_with_prompt'
@@ -108,11 +293,45 @@ class RuleEngine:
         self.tag_index: Dict[str, Set[str]] = {}  # tag -> rule_ids
         self.language_index: Dict[str, Set[str]] = {}  # language -> rule_ids
         self.domain_index: Dict[str, Set[str]] = {}  # domain -> rule_ids
+        
+        # 列式存储的检索字段（build_indexes时生成），按位置与 _rule_ids 对齐
+        self._rule_ids: List[str] = []
+        self._rule_pos: Dict[str, int] = {}  # rule_id -> 位置
+        self._name_lc: List[str] = []
+        self._desc_lc: List[str] = []
+        self._guidelines_lc: List[Tuple[str, ...]] = []
+        self._priority = np.zeros(0, dtype=np.float64)  # 条件平均优先级
+        self._success_weight = np.zeros(0, dtype=np.float64)  # 0.5 + success_rate * 0.5
+        self._text_score_max = np.zeros(0, dtype=np.float64)  # 文本匹配可能的最高得分
+        self._tag_pos: Dict[str, np.ndarray] = {}  # tag -> 规则位置数组
+        self._lang_pos: Dict[str, np.ndarray] = {}
+        self._domain_pos: Dict[str, np.ndarray] = {}
+        self._content_type_pos: Dict[str, np.ndarray] = {}
+        self._rule_type_pos: Dict[str, np.ndarray] = {}
+        self._gram_pos: Dict[str, np.ndarray] = {}  # 检索文本中的字符二元组 -> 规则位置数组
+        # 语言/领域/标签的位集表示：(键 -> 位编号, 规则位置 x 字数 的uint64矩阵)，用于过滤时按位与
+        self._lang_bits: Tuple[Dict[str, int], np.ndarray] = ({}, np.zeros((0, 1), dtype=np.uint64))
+        self._domain_bits: Tuple[Dict[str, int], np.ndarray] = ({}, np.zeros((0, 1), dtype=np.uint64))
+        self._tag_bits: Tuple[Dict[str, int], np.ndarray] = ({}, np.zeros((0, 1), dtype=np.uint64))
+        
+        # 规则条件中正则验证模式的多模式扫描器，随索引一起重建
+        self._pattern_scanner = PatternScanner([])
+        
+        # 搜索结果缓存：规则集变化时递增版本号并清空缓存
+        self._rules_rev = 0
+        self._search_cached = functools.lru_cache(maxsize=512)(self._rank_rules)
+        self._stats_cached = functools.lru_cache(maxsize=128)(self._compute_rule_statistics)
+        self._available_tags: Optional[Tuple[int, Dict[str, List[str]]]] = None  # (版本号, 分组结果)
         self.loaded_at: Optional[datetime] = None
         
         # 数据库实例
         self.database = None
         
+        # 初始化任务：并发或重复调用initialize时共享同一次加载
+        self._init_task: Optional[asyncio.Future] = None
+        # 规则加载时的规则文件签名，用于判断已加载的规则是否过期
+        self._loaded_signature: Optional[Tuple[Tuple[str, int, int], ...]] = None
+        
         # 验证工具映射
         self.validation_tools = {
             'python': ['flake8', 'pylint', 'black', 'mypy'],
@@ -122,74 +341,281 @@ class RuleEngine:
             'yaml': ['yamllint']
         }
         
+        # 规则类型 -> 条件验证方法
+        self._condition_validators = {
+            RuleType.STYLE: self._validate_style_rule,
+            RuleType.CONTENT: self._validate_content_rule,
+            RuleType.FORMAT: self._validate_format_rule,
+            RuleType.PERFORMANCE: self._validate_performance_rule,
+            RuleType.SECURITY: self._validate_security_rule,
+        }
+        
         self.prompt_templates = {}  # template_id -> PromptTemplate
         self.prompt_templates_by_source = {}  # source -> {template_id: PromptTemplate}
+        # 模板选择结果缓存：(domains, languages, content_types, source) -> PromptTemplate，模板变化时清空
+        self._template_choice: Dict[Tuple, Optional[PromptTemplate]] = {}
     
     async def initialize(self) -> None:
-        """异步初始化规则引擎"""
+        """异步初始化规则引擎（只执行一次，并发调用等待同一个初始化任务，失败后允许重试）"""
+        if self._init_task is None:
+            self._init_task = asyncio.ensure_future(self._initialize())
+        try:
+            await self._init_task
+        except Exception:
+            self._init_task = None
+            raise
+    
+    async def _initialize(self) -> None:
+        """加载数据库、规则和索引"""
         # 初始化数据库
         self.database = get_rule_database()
         await self.database.initialize()
         
-        await self.load_rules()
-        self.build_indexes()
+        # 规则快照与规则文件一致时直接映射加载，省去解析和索引构建
+        if not self.load_snapshot():
+            await self.load_rules()
+            self.build_indexes()
+        self._loaded_signature = self._rule_files_signature()
         logger.info(f"规则引擎初始化完成，加载了 {len(self.rules)} 条规则")
     
+    def _rule_files(self) -> Tuple[List[Path], List[Path]]:
+        """返回规则目录下的JSON和YAML规则文件（不含模板目录）"""
+        json_files = [f for f in self.rules_dir.rglob("*.json") if self.templates_dir not in f.parents]
+        yaml_files = [f for f in self.rules_dir.rglob("*.yaml") if self.templates_dir not in f.parents]
+        yaml_files += [f for f in self.rules_dir.rglob("*.yml") if self.templates_dir not in f.parents]
+        return json_files, yaml_files
+    
+    def _rule_files_signature(self) -> Tuple[Tuple[str, int, int], ...]:
+        """规则文件签名（路径、修改时间、大小），用于判断快照是否过期"""
+        json_files, yaml_files = self._rule_files()
+        signature = []
+        for file_path in json_files + yaml_files:
+            stat = file_path.stat()
+            signature.append((str(file_path), stat.st_mtime_ns, stat.st_size))
+        return tuple(sorted(signature))
+    
+    def is_stale(self) -> bool:
+        """已加载的规则是否过期（加载后规则文件有新增、删除或修改）"""
+        return self._loaded_signature is not None and self._loaded_signature != self._rule_files_signature()
+    
+    @property
+    def rules_revision(self) -> int:
+        """规则集版本号：规则重新加载或索引重建时递增，调用方可据此判断依赖规则内容的缓存是否失效"""
+        return self._rules_rev
+    
+    @property
+    def cache_dir(self) -> Path:
+        """本规则目录的缓存根目录，位于配置的用户缓存目录下，按规则目录绝对路径区分"""
+        from .config import get_config
+        key = hashlib.sha1(str(self.rules_dir.resolve()).encode('utf-8')).hexdigest()[:16]
+        return Path(get_config().cache_dir) / "rules" / key
+    
+    @property
+    def yaml_cache_dir(self) -> Optional[Path]:
+        """YAML规则解析缓存目录，目录不安全时为None（不使用缓存）"""
+        cache_dir = _private_cache_dir(str(self.cache_dir / "yaml"))
+        return Path(cache_dir) if cache_dir else None
+    
+    def build_yaml_cache(self) -> int:
+        """预先生成所有YAML规则文件的解析缓存，并清理已过期的缓存文件
+        
+        Returns:
+            缓存的YAML文件数量
+        """
+        if self.yaml_cache_dir is None:
+            return 0
+        cache_dir = str(self.yaml_cache_dir)
+        _, yaml_files = self._rule_files()
+        valid = set()
+        for file_path in yaml_files:
+            try:
+                _decode_rule_file(str(file_path), cache_dir)
+                valid.add(os.path.basename(_yaml_cache_file(str(file_path), cache_dir)))
+            except Exception as e:
+                logger.error(f"生成YAML解析缓存失败 {file_path}: {e}")
+        for cache_file in self.yaml_cache_dir.glob("*.pkl"):
+            if cache_file.name not in valid:
+                cache_file.unlink()
+        return len(valid)
+    
+    @property
+    def snapshot_path(self) -> Path:
+        """规则快照文件路径（位于用户私有的缓存目录下）"""
+        return self.cache_dir / "_rules.bin"
+    
+    def save_snapshot(self, path: Optional[Path] = None) -> Path:
+        """将已加载的规则和列式索引写入快照文件，供多个工作进程以mmap共享加载
+        
+        Args:
+            path: 快照路径，默认位于缓存目录下的 _rules.bin
+            
+        Returns:
+            快照文件路径
+        """
+        path = Path(path) if path else self.snapshot_path
+        if _private_cache_dir(str(path.parent)) is None:
+            raise PermissionError(f"快照目录不安全，拒绝写入: {path.parent}")
+        _write_snapshot(path, {
+            "signature": self._rule_files_signature(),
+            "loaded_at": self.loaded_at,
+            "rules": self.rules,
+            "tag_index": self.tag_index,
+            "language_index": self.language_index,
+            "domain_index": self.domain_index,
+            "rule_ids": self._rule_ids,
+            "name_lc": self._name_lc,
+            "desc_lc": self._desc_lc,
+            "guidelines_lc": self._guidelines_lc,
+            "priority": self._priority,
+            "success_weight": self._success_weight,
+            "text_score_max": self._text_score_max,
+            "tag_pos": self._tag_pos,
+            "lang_pos": self._lang_pos,
+            "domain_pos": self._domain_pos,
+            "content_type_pos": self._content_type_pos,
+            "rule_type_pos": self._rule_type_pos,
+            "gram_pos": self._gram_pos,
+            "lang_bits": self._lang_bits,
+            "domain_bits": self._domain_bits,
+            "tag_bits": self._tag_bits,
+        })
+        logger.info(f"规则快照已保存: {path}")
+        return path
+    
+    def load_snapshot(self, path: Optional[Path] = None) -> bool:
+        """从快照文件加载规则和列式索引
+        
+        Args:
+            path: 快照路径，默认位于缓存目录下的 _rules.bin
+            
+        Returns:
+            快照存在且与当前规则文件一致时返回True
+        """
+        path = Path(path) if path else self.snapshot_path
+        if not path.is_file() or _private_cache_dir(str(path.parent)) is None:
+            return False
+        try:
+            data = _read_snapshot(path)
+            if data["signature"] != self._rule_files_signature():
+                logger.info(f"规则快照已过期，重新加载规则文件: {path}")
+                return False
+        except Exception as e:
+            logger.warning(f"读取规则快照失败 {path}: {e}")
+            return False
+        
+        self.rules = data["rules"]
+        self.loaded_at = data["loaded_at"]
+        self.tag_index = data["tag_index"]
+        self.language_index = data["language_index"]
+        self.domain_index = data["domain_index"]
+        self._rule_ids = data["rule_ids"]
+        self._rule_pos = {rule_id: i for i, rule_id in enumerate(self._rule_ids)}
+        self._name_lc = data["name_lc"]
+        self._desc_lc = data["desc_lc"]
+        self._guidelines_lc = data["guidelines_lc"]
+        self._priority = data["priority"]
+        self._success_weight = data["success_weight"]
+        self._text_score_max = data["text_score_max"]
+        self._tag_pos = data["tag_pos"]
+        self._lang_pos = data["lang_pos"]
+        self._domain_pos = data["domain_pos"]
+        self._content_type_pos = data["content_type_pos"]
+        self._rule_type_pos = data["rule_type_pos"]
+        self._gram_pos = data["gram_pos"]
+        self._lang_bits = data["lang_bits"]
+        self._domain_bits = data["domain_bits"]
+        self._tag_bits = data["tag_bits"]
+        self._build_pattern_scanner()
+        self._rules_rev += 1
+        self._search_cached.cache_clear()
+        self._stats_cached.cache_clear()
+        logger.info(f"从规则快照加载了 {len(self.rules)} 条规则: {path}")
+        return True
+    
     async def load_rules(self) -> None:
         """加载所有规则文件（仅遍历self.rules_dir，不含self.templates_dir）"""
         self.rules.clear()
+        self._rules_rev += 1
+        self._search_cached.cache_clear()
+        self._stats_cached.cache_clear()
         if not self.rules_dir.exists():
             logger.warning(f"规则目录不存在: {self.rules_dir}")
             return
-        # 加载JSON格式规则
-        json_files = [f for f in self.rules_dir.rglob("*.json") if self.templates_dir not in f.parents]
-        for json_file in json_files:
-            await self._load_json_rules(json_file)
-        # 加载YAML格式规则
-        yaml_files = [f for f in self.rules_dir.rglob("*.yaml") if self.templates_dir not in f.parents]
-        yaml_files += [f for f in self.rules_dir.rglob("*.yml") if self.templates_dir not in f.parents]
-        for yaml_file in yaml_files:
-            await self._load_yaml_rules(yaml_file)
+        json_files, yaml_files = self._rule_files()
+        rule_files = json_files + yaml_files
+        if len(rule_files) > 1 and sum(f.stat().st_size for f in rule_files) >= _PARALLEL_DECODE_MIN_BYTES:
+            # 多进程并行解码文件，解析结果在当前进程内按文件顺序合并
+            await self._load_rules_parallel(rule_files)
+        else:
+            # 加载JSON格式规则
+            for json_file in json_files:
+                await self._load_json_rules(json_file)
+            # 加载YAML格式规则
+            for yaml_file in yaml_files:
+                await self._load_yaml_rules(yaml_file)
         self.loaded_at = datetime.utcnow()
         logger.info(f"从 {len(json_files) + len(yaml_files)} 个文件加载了 {len(self.rules)} 条规则")
     
+    async def _load_rules_parallel(self, rule_files: List[Path]) -> None:
+        """使用进程池并行解码规则文件"""
+        loop = asyncio.get_running_loop()
+        cache_dir = str(self.yaml_cache_dir) if self.yaml_cache_dir else None
+        workers = min(len(rule_files), os.cpu_count() or 1)
+        # 按工作进程数均分文件，每批不超过_PARALLEL_DECODE_CHUNK个
+        chunk = max(1, min(_PARALLEL_DECODE_CHUNK, -(-len(rule_files) // workers)))
+        paths = [str(f) for f in rule_files]
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                batches = await asyncio.gather(
+                    *(loop.run_in_executor(executor, _decode_rule_batch, paths[i:i + chunk], cache_dir)
+                      for i in range(0, len(paths), chunk))
+                )
+            decoded = [data for batch in batches for data in batch]
+        except Exception as e:
+            logger.warning(f"并行解码规则文件失败，改为逐个加载: {e}")
+            for file_path in rule_files:
+                if file_path.suffix == '.json':
+                    await self._load_json_rules(file_path)
+                else:
+                    await self._load_yaml_rules(file_path)
+            return
+        
+        for file_path, data in zip(rule_files, decoded):
+            if isinstance(data, Exception):
+                kind = "JSON" if file_path.suffix == '.json' else "YAML"
+                logger.error(f"加载{kind}规则文件失败 {file_path}: {data}")
+                continue
+            await self._ingest_rule_data(data, file_path)
+    
+    async def _ingest_rule_data(self, data: Any, file_path: Path) -> None:
+        """将文件解码得到的数据（单条规则或规则列表）解析后加入规则集"""
+        if isinstance(data, list):
+            # 多个规则的文件
+            for rule_data in data:
+                rule = await self._parse_rule_data(rule_data, file_path)
+                if rule:
+                    self.rules[rule.rule_id] = rule
+        elif isinstance(data, dict):
+            # 单个规则的文件
+            rule = await self._parse_rule_data(data, file_path)
+            if rule:
+                self.rules[rule.rule_id] = rule
+    
     async def _load_json_rules(self, file_path: Path) -> None:
         """加载JSON格式的规则文件"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                
-                if isinstance(data, list):
-                    # 多个规则的JSON文件
-                    for rule_data in data:
-                        rule = await self._parse_rule_data(rule_data, file_path)
-                        if rule:
-                            self.rules[rule.rule_id] = rule
-                elif isinstance(data, dict):
-                    # 单个规则的JSON文件
-                    rule = await self._parse_rule_data(data, file_path)
-                    if rule:
-                        self.rules[rule.rule_id] = rule
-                        
+            # 以字节读取后直接解码（orjson可用时优先使用）
+            data = _decode_rule_file(str(file_path))
+            await self._ingest_rule_data(data, file_path)
         except Exception as e:
             logger.error(f"加载JSON规则文件失败 {file_path}: {e}")
     
     async def _load_yaml_rules(self, file_path: Path) -> None:
         """加载YAML格式的规则文件"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
-                
-                if isinstance(data, list):
-                    for rule_data in data:
-                        rule = await self._parse_rule_data(rule_data, file_path)
-                        if rule:
-                            self.rules[rule.rule_id] = rule
-                elif isinstance(data, dict):
-                    rule = await self._parse_rule_data(data, file_path)
-                    if rule:
-                        self.rules[rule.rule_id] = rule
-                        
+            cache_dir = self.yaml_cache_dir
+            data = _decode_rule_file(str(file_path), str(cache_dir) if cache_dir else None)
+            await self._ingest_rule_data(data, file_path)
         except ImportError:
             logger.warning("PyYAML未安装，跳过YAML文件加载")
         except Exception as e:
@@ -272,29 +698,162 @@ class RuleEngine:
             return RuleType.CONTENT
     
     def build_indexes(self) -> None:
-        """构建搜索索引"""
+        """构建搜索索引，并以列式结构预计算搜索时使用的字段"""
         self.tag_index.clear()
         self.language_index.clear()
         self.domain_index.clear()
-        
-        for rule_id, rule in self.rules.items():
+        self._rules_rev += 1
+        self._search_cached.cache_clear()
+        self._stats_cached.cache_clear()
+        
+        self._rule_ids = list(self.rules.keys())
+        self._rule_pos = {rule_id: i for i, rule_id in enumerate(self._rule_ids)}
+        rules = [self.rules[rule_id] for rule_id in self._rule_ids]
+        
+        # 预计算小写文本，避免每次查询重复调用lower()
+        self._name_lc = [rule.name.lower() for rule in rules]
+        self._desc_lc = [rule.description.lower() for rule in rules]
+        self._guidelines_lc = [tuple(c.guideline.lower() for c in rule.rules) for rule in rules]
+        self._priority = np.asarray(
+            [sum(c.priority for c in rule.rules) / len(rule.rules) if rule.rules else 0.0 for rule in rules],
+            dtype=np.float64
+        )
+        self._success_weight = np.asarray([0.5 + rule.success_rate * 0.5 for rule in rules], dtype=np.float64)
+        self._text_score_max = np.asarray([5.0 + 1.5 * len(rule.rules) for rule in rules], dtype=np.float64)
+        
+        tag_pos: Dict[str, List[int]] = {}
+        lang_pos: Dict[str, List[int]] = {}
+        domain_pos: Dict[str, List[int]] = {}
+        content_type_pos: Dict[str, List[int]] = {}
+        rule_type_pos: Dict[str, List[int]] = {}
+        gram_pos: Dict[str, List[int]] = {}
+        for i, (rule_id, rule) in enumerate(zip(self._rule_ids, rules)):
             # 构建标签索引
-            for tag in rule.tags:
-                if tag not in self.tag_index:
-                    self.tag_index[tag] = set()
-                self.tag_index[tag].add(rule_id)
+            for tag in set(rule.tags):
+                self.tag_index.setdefault(tag, set()).add(rule_id)
+                tag_pos.setdefault(tag, []).append(i)
             
             # 构建语言索引
-            for language in rule.languages:
-                if language not in self.language_index:
-                    self.language_index[language] = set()
-                self.language_index[language].add(rule_id)
+            for language in set(rule.languages):
+                self.language_index.setdefault(language, set()).add(rule_id)
+                lang_pos.setdefault(language, []).append(i)
             
             # 构建领域索引
-            for domain in rule.domains:
-                if domain not in self.domain_index:
-                    self.domain_index[domain] = set()
-                self.domain_index[domain].add(rule_id)
+            for domain in set(rule.domains):
+                self.domain_index.setdefault(domain, set()).add(rule_id)
+                domain_pos.setdefault(domain, []).append(i)
+            
+            for content_type in {ct.value for ct in rule.content_types}:
+                content_type_pos.setdefault(content_type, []).append(i)
+            
+            rule_type_pos.setdefault(rule.rule_type.value, []).append(i)
+            
+            # 文本倒排索引：名称、描述和各条准则中出现的字符二元组
+            text = "\x00".join((self._name_lc[i], self._desc_lc[i]) + self._guidelines_lc[i])
+            for gram in {text[k:k + 2] for k in range(len(text) - 1)}:
+                gram_pos.setdefault(gram, []).append(i)
+        
+        self._tag_pos = {k: np.asarray(v, dtype=np.intp) for k, v in tag_pos.items()}
+        self._lang_pos = {k: np.asarray(v, dtype=np.intp) for k, v in lang_pos.items()}
+        self._domain_pos = {k: np.asarray(v, dtype=np.intp) for k, v in domain_pos.items()}
+        self._content_type_pos = {k: np.asarray(v, dtype=np.intp) for k, v in content_type_pos.items()}
+        self._rule_type_pos = {k: np.asarray(v, dtype=np.intp) for k, v in rule_type_pos.items()}
+        self._gram_pos = {k: np.asarray(v, dtype=np.intp) for k, v in gram_pos.items()}
+        
+        self._build_bitsets()
+        self._build_pattern_scanner()
+    
+    def _build_bitsets(self) -> None:
+        """由语言/领域/标签倒排索引生成位集矩阵（随快照一起保存，加载快照时直接映射）"""
+        size = len(self._rule_ids)
+        self._lang_bits = _pack_bitsets(self._lang_pos, size)
+        self._domain_bits = _pack_bitsets(self._domain_pos, size)
+        self._tag_bits = _pack_bitsets(self._tag_pos, size)
+    
+    def _build_pattern_scanner(self) -> None:
+        """预编译所有条件中标记为禁止的验证模式
+        
+        未标记forbidden的模式描述的是期望的写法（如命名格式），命中并不代表违规，不参与扫描。
+        """
+        self._pattern_scanner = PatternScanner([
+            (rule_id, index, condition.pattern)
+            for rule_id in self._rule_ids
+            for index, condition in enumerate(self.rules[rule_id].rules)
+            if condition.pattern and condition.forbidden
+        ])
+    
+    def _postings_mask(self, index: Dict[str, np.ndarray], keys) -> np.ndarray:
+        """返回命中任一键的规则位置掩码"""
+        mask = np.zeros(len(self._rule_ids), dtype=bool)
+        for key in keys:
+            positions = index.get(key)
+            if positions is not None:
+                mask[positions] = True
+        return mask
+    
+    def _text_mask(self, query_lower: str) -> Optional[np.ndarray]:
+        """返回可能与查询文本匹配的规则位置掩码
+        
+        包含查询的规则必然包含查询的所有字符二元组，掩码外的规则文本匹配分数一定为0；
+        查询不足两个字符时无法过滤，返回None。
+        """
+        if len(query_lower) < 2:
+            return None
+        mask = np.ones(len(self._rule_ids), dtype=bool)
+        for gram in {query_lower[k:k + 2] for k in range(len(query_lower) - 1)}:
+            positions = self._gram_pos.get(gram)
+            if positions is None:
+                return np.zeros(len(self._rule_ids), dtype=bool)
+            gram_mask = np.zeros(len(self._rule_ids), dtype=bool)
+            gram_mask[positions] = True
+            mask &= gram_mask
+        return mask
+    
+    def _bitset_mask(self, bitset: Tuple[Dict[str, int], np.ndarray], keys) -> np.ndarray:
+        """返回命中任一键的规则位置掩码：查询键集合打包为位集后与每条规则的位集按位与"""
+        bit_of, words = bitset
+        query = np.zeros(words.shape[1], dtype=np.uint64)
+        for key in keys:
+            bit = bit_of.get(key)
+            if bit is not None:
+                query[bit >> 6] |= np.uint64(1 << (bit & 63))
+        if words.shape[1] == 1:
+            return (words[:, 0] & query[0]) != 0
+        return (words & query).any(axis=1)
+    
+    def _overlap_counts(self, index: Dict[str, np.ndarray], keys) -> np.ndarray:
+        """统计每条规则与给定键集合的交集大小"""
+        counts = np.zeros(len(self._rule_ids), dtype=np.int32)
+        for key in keys:
+            positions = index.get(key)
+            if positions is not None:
+                counts[positions] += 1
+        return counts
+    
+    def has_rules_for(self, languages: Optional[List[str]] = None, domains: Optional[List[str]] = None,
+                      tags: Optional[List[str]] = None) -> bool:
+        """快速判断是否可能存在满足过滤条件的规则
+        
+        只查询语言/领域/标签索引的键，不做候选集求交：返回False时搜索结果必然为空，
+        返回True时仍需执行完整搜索。
+        
+        Args:
+            languages: 语言过滤
+            domains: 领域过滤
+            tags: 标签过滤
+        
+        Returns:
+            是否可能有匹配规则
+        """
+        if not self.rules:
+            return False
+        if languages and not any(language in self.language_index for language in languages):
+            return False
+        if domains and not any(domain in self.domain_index for domain in domains):
+            return False
+        if tags and not any(tag in self.tag_index for tag in tags):
+            return False
+        return True
     
     async def search_rules(self, search_filter: SearchFilter) -> List[ApplicableRule]:
         """搜索匹配的规则
@@ -305,39 +864,18 @@ class RuleEngine:
         Returns:
             按相关度排序的规则列表
         """
-        candidate_rule_ids = set(self.rules.keys())
-        scores = {}
-        
-        # 应用过滤条件
-        if search_filter.languages:
-            language_candidates = set()
-            for lang in search_filter.languages:
-                language_candidates.update(self.language_index.get(lang, set()))
-            candidate_rule_ids &= language_candidates
-        
-        if search_filter.domains:
-            domain_candidates = set()
-            for domain in search_filter.domains:
-                domain_candidates.update(self.domain_index.get(domain, set()))
-            candidate_rule_ids &= domain_candidates
-        
-        if search_filter.tags:
-            tag_candidates = set()
-            for tag in search_filter.tags:
-                tag_candidates.update(self.tag_index.get(tag, set()))
-            candidate_rule_ids &= tag_candidates
-        
-        # 计算相关度分数
-        for rule_id in candidate_rule_ids:
-            rule = self.rules[rule_id]
-            score = await self._calculate_rule_score(rule, search_filter)
-            scores[rule_id] = score
-        
-        # 排序并返回结果
-        sorted_rules = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+        # 查询条件归一化后作为缓存键，重复查询直接命中缓存
+        ranked = self._search_cached(
+            search_filter.query.lower() if search_filter.query else "",
+            frozenset(search_filter.tags or ()),
+            frozenset(search_filter.languages or ()),
+            frozenset(search_filter.domains or ()),
+            frozenset(ct.value if isinstance(ct, Enum) else ct for ct in (search_filter.content_types or ())),
+            search_filter.limit
+        )
         
         results = []
-        for rule_id, score in sorted_rules[:search_filter.limit]:
+        for rule_id, score in ranked:
             rule = self.rules[rule_id]
             applicable_rule = ApplicableRule(
                 rule=rule,
@@ -349,52 +887,150 @@ class RuleEngine:
         
         return results
     
-    async def _calculate_rule_score(self, rule: CursorRule, search_filter: SearchFilter) -> float:
-        """计算规则的相关度分数"""
-        score = 0.0
+    def _rank_rules(self, query_lower: str, tags_set: FrozenSet[str], languages_set: FrozenSet[str],
+                    domains_set: FrozenSet[str], content_types_set: FrozenSet[str],
+                    limit: int) -> Tuple[Tuple[str, float], ...]:
+        """按归一化的查询条件筛选候选规则，返回相关度最高的前limit条
+        
+        Returns:
+            ((rule_id, score), ...) 元组，按相关度降序，可安全缓存
+        """
+        mask: Optional[np.ndarray] = None
+        
+        # 应用过滤条件：通过倒排索引位置掩码求交集得到候选集
+        if languages_set:
+            mask = self._bitset_mask(self._lang_bits, languages_set)
+        
+        if domains_set:
+            domain_mask = self._bitset_mask(self._domain_bits, domains_set)
+            mask = domain_mask if mask is None else mask & domain_mask
+        
+        if tags_set:
+            tag_mask = self._bitset_mask(self._tag_bits, tags_set)
+            mask = tag_mask if mask is None else mask & tag_mask
+        
+        candidates = np.flatnonzero(mask) if mask is not None else np.arange(len(self._rule_ids))
+        if not candidates.size:
+            return ()
+        
+        # 有文本查询且只需前limit条时，按分数上界做剪枝，只对可能进入前limit的规则做文本匹配
+        if query_lower and limit < candidates.size:
+            return self._rank_bounded(candidates, query_lower, tags_set, languages_set,
+                                      domains_set, content_types_set, limit)
+        
+        # 计算相关度分数并排序
+        scores = self._score_positions(candidates, query_lower, tags_set, languages_set, domains_set, content_types_set)
+        if limit < candidates.size:
+            # 线性时间选出前limit个，再只对这一小段排序
+            top = np.argpartition(-scores, limit - 1)[:limit]
+            order = top[np.lexsort((candidates[top], -scores[top]))]
+        else:
+            order = np.argsort(-scores, kind='stable')
+        rule_ids = self._rule_ids
+        return tuple((rule_ids[candidates[i]], float(scores[i])) for i in order)
+    
+    def _rank_bounded(self, candidates: np.ndarray, query_lower: str, tags_set: FrozenSet[str],
+                      languages_set: FrozenSet[str], domains_set: FrozenSet[str],
+                      content_types_set: FrozenSet[str], limit: int) -> Tuple[Tuple[str, float], ...]:
+        """分支定界选取前limit条规则
+        
+        先向量化计算不含文本匹配的基础分数，加上文本匹配可能的最高得分作为上界，
+        按上界降序逐条做文本匹配；当上界低于当前第limit名的实际分数时提前结束。
+        结果与全量计算后排序一致。
+        """
+        base = self._base_scores(candidates, tags_set, languages_set, domains_set, content_types_set)
+        weight = self._success_weight[candidates]
+        text_mask = self._text_mask(query_lower)
+        text_max = self._text_score_max[candidates]
+        if text_mask is not None:
+            # 不含查询字符二元组的规则文本得分为0，上界随之收紧
+            text_max = np.where(text_mask[candidates], text_max, 0.0)
+        upper = (base + text_max) * weight
+        
+        heap: List[Tuple[float, int]] = []  # (分数, -位置) 最小堆，堆顶为当前第limit名
+        for j in np.argsort(-upper, kind='stable'):
+            if len(heap) == limit and upper[j] < heap[0][0]:
+                break
+            pos = int(candidates[j])
+            text_score = self._text_score(pos, query_lower) if text_mask is None or text_mask[pos] else 0.0
+            item = (float((base[j] + text_score) * weight[j]), -pos)
+            if len(heap) < limit:
+                heapq.heappush(heap, item)
+            else:
+                heapq.heappushpop(heap, item)
         
+        rule_ids = self._rule_ids
+        return tuple((rule_ids[-neg_pos], score) for score, neg_pos in sorted(heap, reverse=True))
+    
+    def _text_score(self, pos: int, query_lower: str) -> float:
+        """计算单条规则的文本匹配分数"""
+        score = 0.0
+        if query_lower in self._name_lc[pos]:
+            score += 3.0
+        if query_lower in self._desc_lc[pos]:
+            score += 2.0
+        for guideline in self._guidelines_lc[pos]:
+            if query_lower in guideline:
+                score += 1.5
+        return score
+    
+    def _base_scores(self, candidates: np.ndarray, tags_set: FrozenSet[str], languages_set: FrozenSet[str],
+                     domains_set: FrozenSet[str], content_types_set: FrozenSet[str]) -> np.ndarray:
+        """向量化计算不含文本匹配和成功率加权的基础分数"""
         # 基础分数：规则优先级
-        if rule.rules:
-            avg_priority = sum(r.priority for r in rule.rules) / len(rule.rules)
-            score += avg_priority * 0.1
-        
-        # 文本匹配分数
-        if search_filter.query:
-            query_lower = search_filter.query.lower()
-            if query_lower in rule.name.lower():
-                score += 3.0
-            if query_lower in rule.description.lower():
-                score += 2.0
-            for condition in rule.rules:
-                if query_lower in condition.guideline.lower():
-                    score += 1.5
+        score = self._priority[candidates] * 0.1
         
         # 标签匹配分数
-        if search_filter.tags:
-            matching_tags = set(search_filter.tags) & set(rule.tags)
-            score += len(matching_tags) * 2.0
+        if tags_set:
+            score += self._overlap_counts(self._tag_pos, tags_set)[candidates] * 2.0
         
         # 语言匹配分数
-        if search_filter.languages:
-            matching_languages = set(search_filter.languages) & set(rule.languages)
-            score += len(matching_languages) * 1.5
+        if languages_set:
+            score += self._overlap_counts(self._lang_pos, languages_set)[candidates] * 1.5
         
         # 领域匹配分数
-        if search_filter.domains:
-            matching_domains = set(search_filter.domains) & set(rule.domains)
-            score += len(matching_domains) * 1.5
+        if domains_set:
+            score += self._overlap_counts(self._domain_pos, domains_set)[candidates] * 1.5
         
         # 内容类型匹配分数
-        if search_filter.content_types:
-            rule_content_types = {ct.value for ct in rule.content_types}
-            matching_content_types = set(search_filter.content_types) & rule_content_types
-            score += len(matching_content_types) * 1.0
+        if content_types_set:
+            score += self._overlap_counts(self._content_type_pos, content_types_set)[candidates] * 1.0
+        
+        return score
+    
+    def _score_positions(self, candidates: np.ndarray, query_lower: str, tags_set: FrozenSet[str],
+                         languages_set: FrozenSet[str], domains_set: FrozenSet[str],
+                         content_types_set: FrozenSet[str]) -> np.ndarray:
+        """基于列式字段批量计算候选规则的相关度分数"""
+        score = self._base_scores(candidates, tags_set, languages_set, domains_set, content_types_set)
+        
+        # 文本匹配分数：只对文本倒排索引命中的规则做子串匹配
+        if query_lower:
+            text_mask = self._text_mask(query_lower)
+            hits = np.arange(candidates.size) if text_mask is None else np.flatnonzero(text_mask[candidates])
+            text_scores = np.zeros(candidates.size, dtype=np.float64)
+            text_scores[hits] = [self._text_score(int(candidates[j]), query_lower) for j in hits]
+            score += text_scores
         
         # 成功率加权
-        score *= (0.5 + rule.success_rate * 0.5)
+        score *= self._success_weight[candidates]
         
         return score
     
+    async def _calculate_rule_score(self, rule: CursorRule, search_filter: SearchFilter) -> float:
+        """计算规则的相关度分数"""
+        if rule.rule_id not in self._rule_pos:
+            self.build_indexes()
+        scores = self._score_positions(
+            np.asarray([self._rule_pos[rule.rule_id]], dtype=np.intp),
+            search_filter.query.lower() if search_filter.query else "",
+            frozenset(search_filter.tags or ()),
+            frozenset(search_filter.languages or ()),
+            frozenset(search_filter.domains or ()),
+            frozenset(ct.value if isinstance(ct, Enum) else ct for ct in (search_filter.content_types or ()))
+        )
+        return float(scores[0])
+    
     async def _get_matched_conditions(self, rule: CursorRule, search_filter: SearchFilter) -> List[str]:
         """获取匹配的条件列表"""
         matched = []
@@ -465,12 +1101,17 @@ class RuleEngine:
         
         applicable_rules = await self.search_rules(search_filter)
         
+        # 所有规则的验证模式只扫描内容一次
+        pattern_hits = self._pattern_scanner.scan(content) if self._pattern_scanner else {}
+        
         # 对每个规则进行验证
         for applicable_rule in applicable_rules:
             rule = applicable_rule.rule
             
             # 执行规则验证
             rule_issues = await self._validate_rule(content, rule, applicable_rule.application_context)
+            if pattern_hits:
+                rule_issues.extend(self._pattern_issues(rule, pattern_hits))
             issues.extend(rule_issues)
             
             if rule_issues:
@@ -520,6 +1161,25 @@ class RuleEngine:
         
         return issues
     
+    def _pattern_issues(self, rule: CursorRule, pattern_hits: Dict[Tuple[str, int], int]) -> List[ValidationIssue]:
+        """将多模式扫描的命中结果转换为该规则的验证问题"""
+        issues = []
+        for index, condition in enumerate(rule.rules):
+            if not condition.forbidden:
+                continue
+            line_num = pattern_hits.get((rule.rule_id, index))
+            if line_num is None:
+                continue
+            issues.append(ValidationIssue(
+                line_number=line_num,
+                column_number=0,
+                message=f"内容匹配规则禁止的模式: {condition.pattern}",
+                severity=rule.validation.severity,
+                rule_id=rule.rule_id,
+                suggestion=condition.guideline
+            ))
+        return issues
+    
     async def _is_condition_applicable(self, condition: RuleCondition, application_context: Dict[str, Any]) -> bool:
         """检查条件是否适用于当前上下文"""
         # 基于条件的触发条件判断
@@ -544,16 +1204,9 @@ class RuleEngine:
         issues = []
         
         # 基于规则类型执行不同的验证逻辑
-        if rule.rule_type == RuleType.STYLE:
-            issues.extend(await self._validate_style_rule(content, condition, rule))
-        elif rule.rule_type == RuleType.CONTENT:
-            issues.extend(await self._validate_content_rule(content, condition, rule))
-        elif rule.rule_type == RuleType.FORMAT:
-            issues.extend(await self._validate_format_rule(content, condition, rule))
-        elif rule.rule_type == RuleType.PERFORMANCE:
-            issues.extend(await self._validate_performance_rule(content, condition, rule))
-        elif rule.rule_type == RuleType.SECURITY:
-            issues.extend(await self._validate_security_rule(content, condition, rule))
+        validator = self._condition_validators.get(rule.rule_type)
+        if validator is not None:
+            issues.extend(await validator(content, condition, rule))
         
         return issues
     
@@ -563,17 +1216,15 @@ class RuleEngine:
         
         # 示例：检查行长度
         if 'line length' in condition.guideline.lower() or 'line_length' in rule.tags:
-            lines = content.split('\n')
-            for i, line in enumerate(lines, 1):
-                if len(line) > 79:  # PEP8标准
-                    issues.append(ValidationIssue(
-                        line_number=i,
-                        column_number=80,
-                        message=f"行长度 {len(line)} 超过79字符限制",
-                        severity=rule.validation.severity,
-                        rule_id=rule.rule_id,
-                        suggestion=f"将长行拆分为多行"
-                    ))
+            for i, length in find_long_lines(content, 79):  # PEP8标准
+                issues.append(ValidationIssue(
+                    line_number=i,
+                    column_number=80,
+                    message=f"行长度 {length} 超过79字符限制",
+                    severity=rule.validation.severity,
+                    rule_id=rule.rule_id,
+                    suggestion=f"将长行拆分为多行"
+                ))
         
         # 示例：检查函数命名
         if 'function' in condition.condition.lower() and any(lang in rule.languages for lang in ['python']):
@@ -826,33 +1477,26 @@ class RuleEngine:
         return self.rules.get(rule_id)
     
     async def get_available_tags(self) -> Dict[str, List[str]]:
-        """获取所有可用标签，按类别分组"""
+        """获取所有可用标签，按类别分组（结果按规则集版本缓存）"""
+        if self._available_tags is not None and self._available_tags[0] == self._rules_rev:
+            return self._available_tags[1]
+        
         all_tags = set()
         for rule in self.rules.values():
             all_tags.update(rule.tags)
         
         # 按类别分组标签
-        categories = {
-            "编程语言": ["python", "cpp", "fortran", "shell", "javascript", "typescript", "java", "go"],
-            "领域": ["meteorology", "ionosphere", "surveying", "oceanography", "geophysics", "astronomy"],
-            "任务类型": ["coding", "documentation", "analysis", "visualization", "testing"],
-            "质量类型": ["style", "performance", "security", "readability", "maintainability"],
-            "内容类型": ["code", "documentation", "data_interface", "algorithm", "configuration"]
+        result = {
+            category: [tag for tag in category_tags if tag in all_tags]
+            for category, category_tags in _TAG_CATEGORIES
         }
         
-        result = {}
-        for category, category_tags in categories.items():
-            result[category] = [tag for tag in category_tags if tag in all_tags]
-        
         # 添加其他未分类的标签
-        categorized_tags = set()
-        for tags in result.values():
-            categorized_tags.update(tags)
-        
-        other_tags = all_tags - categorized_tags
+        other_tags = all_tags - _CATEGORIZED_TAGS
         if other_tags:
-            result["其他"] = sorted(list(other_tags))
+            result["其他"] = sorted(other_tags)
         
+        self._available_tags = (self._rules_rev, result)
         return result
     
     async def reload(self) -> None:
@@ -860,6 +1504,7 @@ class RuleEngine:
         logger.info("重新加载规则引擎...")
         await self.load_rules()
         self.build_indexes()
+        self._loaded_signature = self._rule_files_signature()
         logger.info(f"规则引擎重新加载完成，加载了 {len(self.rules)} 条规则")
 
     async def get_statistics(self) -> Dict[str, Any]:
@@ -890,6 +1535,7 @@ class RuleEngine:
             self.prompt_templates_by_source.clear()
         if template_files is None:
             template_files = list(self.templates_dir.rglob("*.yaml")) + list(self.templates_dir.rglob("*.yml")) + list(self.templates_dir.rglob("*.md"))
+        self._template_choice.clear()
         for file_path in template_files:
             templates = import_prompt_templates_from_file(file_path)
             if mode == 'grouped':
@@ -903,6 +1549,14 @@ class RuleEngine:
 
     def select_prompt_template(self, domains=None, languages=None, content_types=None, source=None):
         """自动选择最优模板，支持优先级和分组。source指定时只在该来源分组内选，否则全局选。"""
+        # 匹配得分只取决于各维度的集合，按集合缓存选择结果
+        key = (frozenset(domains or ()), frozenset(languages or ()), frozenset(content_types or ()), source)
+        if key not in self._template_choice:
+            self._template_choice[key] = self._select_prompt_template(domains, languages, content_types, source)
+        return self._template_choice[key]
+
+    def _select_prompt_template(self, domains=None, languages=None, content_types=None, source=None):
+        """按领域/语言/内容类型匹配得分和优先级选择模板"""
         candidates = []
         if source and source in self.prompt_templates_by_source:
             candidates = list(self.prompt_templates_by_source[source].values())
@@ -928,20 +1582,36 @@ class RuleEngine:
         """
         获取规则统计信息，支持多维度过滤。
         """
-        # 过滤规则
-        filtered_rules = list(self.rules.values())
-        if languages:
-            langs = [l.strip() for l in languages.split(',') if l.strip()]
-            filtered_rules = [r for r in filtered_rules if any(lang in r.languages for lang in langs)]
-        if domains:
-            doms = [d.strip() for d in domains.split(',') if d.strip()]
-            filtered_rules = [r for r in filtered_rules if any(domain in r.domains for domain in doms)]
-        if rule_types:
-            types = [t.strip().lower() for t in rule_types.split(',') if t.strip()]
-            filtered_rules = [r for r in filtered_rules if r.rule_type.value in types]
-        if tags:
-            taglist = [t.strip() for t in tags.split(',') if t.strip()]
-            filtered_rules = [r for r in filtered_rules if any(tag in r.tags for tag in taglist)]
+        if len(self._rule_ids) != len(self.rules):
+            self.build_indexes()
+        
+        # 过滤条件归一化为集合后作为缓存键，相同过滤组合直接复用统计结果
+        # （None表示该维度不过滤）
+        stats = self._stats_cached(
+            _filter_set(languages) if languages else None,
+            _filter_set(domains) if domains else None,
+            _filter_set(rule_types, lower=True) if rule_types else None,
+            _filter_set(tags) if tags else None
+        )
+        return {key: dict(value) if isinstance(value, dict) else value for key, value in stats.items()}
+    
+    def _compute_rule_statistics(self,
+                                 langs: Optional[FrozenSet[str]],
+                                 doms: Optional[FrozenSet[str]],
+                                 types: Optional[FrozenSet[str]],
+                                 taglist: Optional[FrozenSet[str]]) -> dict:
+        """按归一化的过滤条件计算规则统计（结果由_stats_cached缓存）"""
+        # 过滤规则：各维度的倒排索引位置掩码求交集
+        mask = np.ones(len(self._rule_ids), dtype=bool)
+        if langs is not None:
+            mask &= self._bitset_mask(self._lang_bits, langs)
+        if doms is not None:
+            mask &= self._bitset_mask(self._domain_bits, doms)
+        if types is not None:
+            mask &= self._postings_mask(self._rule_type_pos, types)
+        if taglist is not None:
+            mask &= self._bitset_mask(self._tag_bits, taglist)
+        filtered_rules = [self.rules[self._rule_ids[i]] for i in np.flatnonzero(mask)]
         # 统计
         by_language = {}
         by_domain = {}
@@ -969,13 +1639,13 @@ class RuleEngine:
         """
         templates = list(self.prompt_templates.values())
         if languages:
-            langs = [l.strip() for l in languages.split(',') if l.strip()]
+            langs = parse_filter_param(languages)
             templates = [t for t in templates if any(lang in t.languages for lang in langs)]
         if domains:
-            doms = [d.strip() for d in domains.split(',') if d.strip()]
+            doms = parse_filter_param(domains)
             templates = [t for t in templates if any(domain in t.domains for domain in doms)]
         if tags:
-            taglist = [t.strip() for t in tags.split(',') if t.strip()]
+            taglist = parse_filter_param(tags)
             templates = [t for t in templates if any(tag in getattr(t, 'tags', []) for tag in taglist)]
         by_language = {}
         by_group = {}  # 按 source 分组
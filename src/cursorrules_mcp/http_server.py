@@ -12,16 +12,18 @@ License: MIT
 import asyncio
 import json
 import logging
+import os
+import signal
 from typing import Dict, Any, Optional, AsyncGenerator, List
 from pathlib import Path
 import uuid
 from datetime import datetime
 from fastapi import FastAPI, Request, Response, HTTPException
-    from fastapi.middleware.cors import CORSMiddleware
-    from fastapi.responses import StreamingResponse
-    import uvicorn
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, JSONResponse, ORJSONResponse
+import uvicorn
 from pydantic import BaseModel, HttpUrl
-from .engine import RuleEngine
+from .engine import RuleEngine, parse_filter_param
 from .models import (
     MCPContext, SearchFilter, ValidationSeverity, RuleType,
     ContentType, TaskType, CursorRule
@@ -29,6 +31,9 @@ from .models import (
 from .rule_import import YamlRuleParser, RuleImportError
 from pydantic import validator
 from .database import get_rule_database
+from .logging_setup import stop_queue_logging
+from . import _json
+from .validators import get_temp_dir
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
@@ -41,10 +46,10 @@ class ImportRuleRequest(BaseModel):
     merge: bool = False
     append_mode: bool = False  # 仅用于内容导入
 
-    @validator('content', 'url')
+    @validator('content', always=True)
     def validate_import_source(cls, v, values):
-        # 确保至少提供了一个导入源
-        if not values.get('url') and not values.get('content'):
+        # 确保至少提供了一个导入源（url 先于 content 校验，此时已在 values 中）
+        if not values.get('url') and not v:
             raise ValueError("必须提供 url 或 content 中的一个")
         return v
 
@@ -55,6 +60,18 @@ class ImportRuleRequest(BaseModel):
             raise ValueError("append_mode 只能用于内容导入，不支持URL导入")
         return v
 
+class ImportRuleFile(BaseModel):
+    """流式批量导入中的单个规则文件"""
+    content: str
+    format: str = "auto"  # auto, markdown, yaml, json
+
+class ImportRulesStreamRequest(BaseModel):
+    """流式批量导入请求"""
+    files: List[ImportRuleFile]
+    merge: bool = False
+
+_IMPORT_FILE_EXTS: Dict[str, str] = {'markdown': '.md', 'yaml': '.yaml', 'json': '.json'}
+
 class ImportRuleResponse(BaseModel):
     """规则导入响应"""
     success: bool
@@ -68,7 +85,8 @@ class MCPHttpServer:
     支持通过HTTP/SSE提供MCP服务
     """
     
-    def __init__(self, rules_dir: str = "data/rules", host: str = "localhost", port: int = 8000, workers: int = 1):
+    def __init__(self, rules_dir: str = "data/rules", host: str = "localhost", port: int = 8000, workers: int = 1,
+                 rule_engine: Optional[RuleEngine] = None):
         """初始化HTTP服务器
         
         Args:
@@ -76,19 +94,40 @@ class MCPHttpServer:
             host: 服务器主机地址
             port: 服务器端口
             workers: 工作进程数量，默认为1
+            rule_engine: 可选的规则引擎实例，传入已初始化的引擎时不再重复加载规则
         """
         self.app = FastAPI(
             title="CursorRules-MCP HTTP Server",
             description="MCP服务器 - 支持HTTP/SSE传输",
-            version="1.0.0"
+            version="1.0.0",
+            default_response_class=ORJSONResponse if _json.HAS_ORJSON else JSONResponse
         )
-        self.rule_engine = RuleEngine(rules_dir)
+        self.rule_engine = rule_engine if rule_engine is not None else RuleEngine(rules_dir)
         self.host = host
         self.port = port
         self.workers = workers
         self._initialized = False
         self._active_connections: Dict[str, Dict] = {}
         
+        # JSON-RPC方法与工具的分发表
+        self._method_handlers = {
+            "tools/list": lambda params: self._list_tools(),
+            "tools/call": self._call_tool,
+            "resources/list": lambda params: self._list_resources(),
+            "resources/read": self._read_resource,
+            "initialize": self._initialize,
+            "validate_content": lambda params: self._validate_content(**params),
+            "import_resource": lambda params: self._import_resource(**params),
+            "get_statistics": lambda params: self._get_statistics(**params),
+        }
+        self._tool_handlers = {
+            "search_rules": self._search_rules,
+            "validate_content": self._validate_content,
+            "enhance_prompt": self._enhance_prompt,
+            "get_statistics": self._get_statistics,
+            "import_resource": self._import_resource,
+        }
+        
         self._setup_middleware()
         self._setup_routes()
     
@@ -163,27 +202,30 @@ class MCPHttpServer:
         
         @self.app.post("/mcp/jsonrpc")
         async def handle_jsonrpc(request: Request):
-            """处理MCP JSON-RPC请求"""
+            """处理MCP JSON-RPC请求（默认返回紧凑JSON，?pretty=1 时缩进输出）"""
             try:
                 # 确保初始化
                 await self._ensure_initialized()
                 
                 # 解析JSON-RPC请求
-                body = await request.json()
+                body = _json.loads(await request.body())
                 
                 # 验证JSON-RPC格式
                 if not self._validate_jsonrpc(body):
-                    return self._error_response(-32600, "Invalid Request")
-                
-                # 处理请求
-                response = await self._handle_mcp_request(body)
-                return response
+                    response = self._error_response(-32600, "Invalid Request")
+                else:
+                    # 处理请求
+                    response = await self._handle_mcp_request(body)
                 
             except json.JSONDecodeError:
-                return self._error_response(-32700, "Parse error")
+                response = self._error_response(-32700, "Parse error")
             except Exception as e:
                 logger.error(f"处理JSON-RPC请求时出错: {e}")
-                return self._error_response(-32603, f"Internal error: {str(e)}")
+                response = self._error_response(-32603, f"Internal error: {str(e)}")
+            
+            if request.query_params.get("pretty") in ("1", "true"):
+                return Response(_json.dumps(response, indent=True), media_type="application/json")
+            return response
         
         @self.app.get("/mcp/sse")
         async def sse_endpoint(request: Request, connection_id: Optional[str] = None):
@@ -270,6 +312,41 @@ class MCPHttpServer:
                 raise HTTPException(status_code=400, detail=str(e))
             except Exception as e:
                 raise HTTPException(status_code=500, detail=f"服务器错误: {str(e)}")
+        
+        @self.app.post("/import_rule/stream")
+        async def import_rule_stream(request: ImportRulesStreamRequest):
+            """
+            流式批量导入规则
+            
+            各文件并发解析，每个文件解析完成后立即保存其规则，并以NDJSON逐行返回每条规则的导入状态，
+            最后一行为导入汇总；客户端无需等待整批导入完成即可开始处理结果
+            """
+            import shutil
+            import tempfile
+            from .rule_import import UnifiedRuleImporter
+            
+            if not request.files:
+                raise HTTPException(status_code=400, detail="必须提供至少一个规则文件")
+            
+            temp_dir = tempfile.mkdtemp(prefix="cursorrules_import_", dir=get_temp_dir())
+            for index, item in enumerate(request.files):
+                format = item.format.lower()
+                if format not in _IMPORT_FILE_EXTS:
+                    content = item.content.lstrip()
+                    format = "markdown" if content.startswith('---') else "json" if content[:1] in ('{', '[') else "yaml"
+                with open(os.path.join(temp_dir, f"{index:05d}{_IMPORT_FILE_EXTS[format]}"), 'w', encoding='utf-8') as f:
+                    f.write(item.content)
+            
+            async def ndjson_stream():
+                try:
+                    importer = UnifiedRuleImporter(save_to_database=True)
+                    async for line in importer.iter_import_rules([temp_dir], merge=request.merge):
+                        yield line
+                    await self.rule_engine.reload()
+                finally:
+                    shutil.rmtree(temp_dir, ignore_errors=True)
+            
+            return StreamingResponse(ndjson_stream(), media_type="application/x-ndjson")
     
     def _validate_jsonrpc(self, data: Dict[str, Any]) -> bool:
         """验证JSON-RPC请求格式"""
@@ -284,24 +361,10 @@ class MCPHttpServer:
         
         try:
             # 路由到对应的处理方法
-            if method == "tools/list":
-                result = await self._list_tools()
-            elif method == "tools/call":
-                result = await self._call_tool(params)
-            elif method == "resources/list":
-                result = await self._list_resources()
-            elif method == "resources/read":
-                result = await self._read_resource(params)
-            elif method == "initialize":
-                result = await self._initialize(params)
-            elif method == "validate_content":
-                result = await self._validate_content(**params)
-            elif method == "import_resource":
-                result = await self._import_resource(**params)
-            elif method == "get_statistics":
-                result = await self._get_statistics(**params)
-            else:
+            handler = self._method_handlers.get(method)
+            if handler is None:
                 return self._error_response(-32601, f"Method not found: {method}", request_id)
+            result = await handler(params)
             
             return {
                 "jsonrpc": "2.0",
@@ -514,18 +577,10 @@ class MCPHttpServer:
         tool_name = params.get("name")
         arguments = params.get("arguments", {})
         
-        if tool_name == "search_rules":
-            result = await self._search_rules(**arguments)
-        elif tool_name == "validate_content":
-            result = await self._validate_content(**arguments)
-        elif tool_name == "enhance_prompt":
-            result = await self._enhance_prompt(**arguments)
-        elif tool_name == "get_statistics":
-            result = await self._get_statistics(**arguments)
-        elif tool_name == "import_resource":
-            result = await self._import_resource(**arguments)
-        else:
+        handler = self._tool_handlers.get(tool_name)
+        if handler is None:
             raise ValueError(f"Unknown tool: {tool_name}")
+        result = await handler(**arguments)
         
         # 保证text字段始终为字符串
         return {
@@ -726,7 +781,7 @@ class MCPHttpServer:
                 engine = self.rule_engine
                 # 创建临时文件
                 ext = '.md' if format == 'markdown' else '.yaml'
-                with tempfile.NamedTemporaryFile(mode='w', suffix=ext, delete=False, encoding='utf-8') as temp_file:
+                with tempfile.NamedTemporaryFile(mode='w', suffix=ext, delete=False, encoding='utf-8', dir=get_temp_dir()) as temp_file:
                     temp_file.write(content)
                     temp_path = temp_file.name
                 try:
@@ -744,14 +799,14 @@ class MCPHttpServer:
                 # 导入规则
                 from .rule_import import UnifiedRuleImporter
                 ext = '.yaml' if format in ['yaml', 'yml'] else '.md' if format == 'markdown' else '.json'
-                with tempfile.NamedTemporaryFile(mode='w', suffix=ext, delete=False, encoding='utf-8') as temp_file:
+                with tempfile.NamedTemporaryFile(mode='w', suffix=ext, delete=False, encoding='utf-8', dir=get_temp_dir()) as temp_file:
                     temp_file.write(content)
                     temp_path = temp_file.name
                 try:
-                importer = UnifiedRuleImporter(save_to_database=True)
+                    importer = UnifiedRuleImporter(save_to_database=True)
                     rules = await importer.import_rules_async([temp_path], merge=merge)
                     await self.rule_engine.reload()
-                
+                    
                     # 检查导入日志中的错误
                     import_log = importer.get_import_summary()
                     if import_log['failed_imports'] > 0:
@@ -776,28 +831,28 @@ class MCPHttpServer:
                                 "failed_imports": import_log['failed_imports']
                             }
                         }
-                
-                return {
-                    "success": True,
-                    "message": f"✅ 成功导入 {len(rules)} 条规则到数据库",
+                    
+                    return {
+                        "success": True,
+                        "message": f"✅ 成功导入 {len(rules)} 条规则到数据库",
                         "imported": len(rules),
                         "resource_type": "rules",
                         "details": {
                             "total_files": import_log['total_files'],
                             "successful_imports": import_log['successful_imports'],
                             "failed_imports": import_log['failed_imports']
-                }
+                        }
                     }
                 finally:
                     if os.path.exists(temp_path):
                         os.remove(temp_path)
         except Exception as e:
-                return {
-                    "success": False,
+            return {
+                "success": False,
                 "message": f"❌ 导入资源失败: {e}",
                 "imported": 0,
                 "resource_type": type or "auto"
-                }
+            }
     
     async def _list_all_rules(self) -> str:
         """列出所有规则"""
@@ -844,7 +899,7 @@ class MCPHttpServer:
         """解析列表参数"""
         if not param or not param.strip():
             return None
-        return [item.strip() for item in param.split(',') if item.strip()]
+        return list(parse_filter_param(param))
     
     def _infer_languages_from_path(self, file_path: str) -> list:
         """从文件路径推断编程语言"""
@@ -923,7 +978,7 @@ class MCPHttpServer:
     
     def _create_sse_event(self, event_type: str, data: Dict[str, Any]) -> str:
         """创建SSE事件"""
-        return f"event: {event_type}\ndata: {json.dumps(data)}\n\n"
+        return f"event: {event_type}\ndata: {_json.dumps(data)}\n\n"
     
     def _error_response(self, code: int, message: str, request_id: Any = None) -> Dict[str, Any]:
         """创建错误响应"""
@@ -937,19 +992,23 @@ class MCPHttpServer:
         }
     
     async def _ensure_initialized(self):
-        """确保服务器已初始化"""
+        """确保服务器已初始化（并发的首批请求共享规则引擎的同一次初始化）"""
         if not self._initialized:
             logger.info("正在初始化规则引擎...")
             await self.rule_engine.initialize()
-            self._initialized = True
-            logger.info("✅ 规则引擎初始化完成")
+            if not self._initialized:
+                self._initialized = True
+                logger.info("✅ 规则引擎初始化完成")
     
     def run(self):
         """运行HTTP服务器"""
         logger.info(f"🚀 启动CursorRules-MCP HTTP服务器: http://{self.host}:{self.port}")
-        if self.workers > 1:
+        if self.workers > 1 and hasattr(os, "fork"):
+            logger.info(f"👥 使用 {self.workers} 个工作进程（预加载模式）")
+            self.run_preforked()
+        elif self.workers > 1:
             logger.info(f"👥 使用 {self.workers} 个工作进程")
-            # 多进程模式需要使用导入字符串
+            # 不支持fork的平台（Windows）由uvicorn以spawn方式启动工作进程，各进程分别加载规则
             uvicorn.run(
                 "src.cursorrules_mcp.http_server:create_app",
                 host=self.host,
@@ -966,6 +1025,82 @@ class MCPHttpServer:
                 port=self.port,
                 log_level="info"
             )
+    
+    def run_preforked(self):
+        """预加载多进程模式（仅限支持fork的平台）
+        
+        父进程先完成规则加载和索引构建并绑定监听端口，再fork出各工作进程，
+        工作进程直接复用父进程中已初始化的应用，规则数据以写时复制方式共享。
+        """
+        asyncio.run(self._ensure_initialized())
+        config = uvicorn.Config(self.app, host=self.host, port=self.port, log_level="info")
+        sock = config.bind_socket()
+        
+        # fork期间屏蔽终止信号：父进程的信号处理函数安装完成后才处理，工作进程恢复默认处理后再解除屏蔽
+        stop_signals = (signal.SIGTERM, signal.SIGINT)
+        children = set()
+        stopping = False
+        
+        def stop_workers(signum=None, frame=None):
+            """通知所有工作进程退出（统一发送SIGTERM，避免uvicorn把重复的SIGINT视为强制退出）"""
+            nonlocal stopping
+            stopping = True
+            for pid in list(children):
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+        
+        signal.pthread_sigmask(signal.SIG_BLOCK, stop_signals)
+        previous_handlers = {sig: signal.signal(sig, stop_workers) for sig in stop_signals}
+        try:
+            for _ in range(self.workers):
+                pid = os.fork()
+                if pid == 0:
+                    exit_code = 0
+                    try:
+                        for sig in stop_signals:
+                            signal.signal(sig, signal.SIG_DFL)
+                        signal.pthread_sigmask(signal.SIG_UNBLOCK, stop_signals)
+                        uvicorn.Server(config).run(sockets=[sock])
+                    except BaseException as e:
+                        logger.error(f"工作进程运行失败: {e}")
+                        exit_code = 1
+                    finally:
+                        stop_queue_logging()
+                        os._exit(exit_code)
+                children.add(pid)
+            signal.pthread_sigmask(signal.SIG_UNBLOCK, stop_signals)
+            
+            # 回收任意先退出的工作进程：收到终止信号后等待全部退出；
+            # 未收到终止信号时有工作进程退出，则停止其余工作进程并报告错误
+            failed = None
+            while children:
+                try:
+                    pid, status = os.wait()
+                except ChildProcessError:
+                    break
+                children.discard(pid)
+                if not stopping:
+                    failed = (pid, os.waitstatus_to_exitcode(status))
+                    logger.error(f"工作进程 {pid} 意外退出（退出码 {failed[1]}），正在停止其余工作进程")
+                    stop_workers()
+        finally:
+            # 异常退出时不遗留工作进程
+            if children:
+                stop_workers()
+                for pid in list(children):
+                    try:
+                        os.waitpid(pid, 0)
+                    except ChildProcessError:
+                        pass
+            signal.pthread_sigmask(signal.SIG_UNBLOCK, stop_signals)
+            for sig, handler in previous_handlers.items():
+                signal.signal(sig, handler)
+            sock.close()
+        
+        if failed is not None:
+            raise RuntimeError(f"工作进程 {failed[0]} 意外退出（退出码 {failed[1]}）")
 
 
 def create_app():
@@ -977,6 +1112,10 @@ def create_app():
         FastAPI应用实例
     """
     import os
+    from .logging_setup import setup_queue_logging
+    
+    # 每个工作进程的日志经队列交由单个后台线程输出
+    setup_queue_logging()
     
     rules_dir = os.getenv("CURSORRULES_RULES_DIR", "data/rules")
     host = os.getenv("CURSORRULES_HOST", "localhost")
@@ -0,0 +1,70 @@
+"""
+日志队列配置模块
+将根日志记录器的输出改为经由队列交给单个后台线程格式化和写出，避免请求处理路径上的输出锁竞争
+
+Author: Mapoet
+Institution: NUS/STAR
+Date: 2025-01-23
+License: MIT
+"""
+
+import atexit
+import logging
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+# 全局日志监听器实例
+_listener: Optional[QueueListener] = None
+
+
+def setup_queue_logging() -> QueueListener:
+    """将根日志记录器的处理器替换为QueueHandler，原处理器交由QueueListener后台线程执行
+
+    重复调用时直接返回已有的监听器。
+
+    Returns:
+        日志队列监听器
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    root = logging.getLogger()
+    handlers = list(root.handlers) or [logging.StreamHandler()]
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+
+    log_queue = queue.SimpleQueue()
+    root.addHandler(QueueHandler(log_queue))
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_queue_logging)
+    return _listener
+
+
+def _restart_after_fork() -> None:
+    """fork出的子进程中没有监听线程，为其重新创建队列和监听器"""
+    global _listener
+    if _listener is None:
+        return
+    handlers = _listener.handlers
+    log_queue = queue.SimpleQueue()
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, QueueHandler):
+            handler.queue = log_queue
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_after_fork)
+
+
+def stop_queue_logging() -> None:
+    """停止日志监听器并输出队列中剩余的日志"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
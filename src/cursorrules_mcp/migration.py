@@ -294,8 +294,12 @@ class RuleMigration:
         print(f"✅ 迁移日志已保存到 {log_file}")
 
 
-async def perform_database_migration():
-    """执行完整的数据库迁移"""
+async def perform_database_migration(bulk: bool = False):
+    """执行完整的数据库迁移
+
+    Args:
+        bulk: 批量模式，添加规则时不逐条重建索引，全部添加后统一构建一次
+    """
     print("🚀 开始规则库数据化迁移...")
 
     # 1. 迁移现有规则
@@ -323,12 +327,14 @@ async def perform_database_migration():
     database = get_rule_database()
     await database.initialize()
 
-    # 添加新生成的规则到数据库
+    # 添加新生成的规则到数据库（批量模式下延迟索引构建）
     for rule in generated_rules:
         try:
-            await database.add_rule(rule)
+            await database.add_rule(rule, rebuild_index=not bulk)
         except Exception as e:
             print(f"⚠️ 添加规则失败 {rule.rule_id}: {e}")
+    if bulk:
+        await database.rebuild_indexes()
 
     # 4. 生成数据库统计报告
     stats = database.get_database_stats()
@@ -124,6 +124,10 @@ class RuleCondition(BaseModel):
     pattern: Optional[str] = Field(
         default=None, description="Regex pattern for validation"
     )
+    forbidden: bool = Field(
+        default=False,
+        description="Report content matching the pattern as a violation",
+    )
 
 
 class RuleApplication(BaseModel):
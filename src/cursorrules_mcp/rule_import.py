@@ -8,12 +8,13 @@ Date: 2025-01-23
 License: MIT
 """
 
+import asyncio
 import json
 import yaml
 import re
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Optional, Union, Set, Tuple, AsyncIterator
 from datetime import datetime, timezone
 import logging
 import os
@@ -26,16 +27,37 @@ except ImportError:
     frontmatter = None
     logging.warning("python-frontmatter not installed. Markdown frontmatter parsing will be limited.")
 
+# 优先使用LibYAML C扩展的安全加载器，不可用时回退到纯Python实现
+try:
+    from yaml import CSafeLoader as YamlSafeLoader
+except ImportError:
+    from yaml import SafeLoader as YamlSafeLoader
+
 from .models import (
     CursorRule, RuleType, ContentType, TaskType, ValidationSeverity,
     RuleCondition, RuleApplication, RuleValidation
 )
 from .database import RuleDatabase
+from . import _json
 
 logger = logging.getLogger(__name__)
 
 __all__ = ['YamlRuleParser', 'RuleImportError', 'UnifiedRuleImporter']
 
+# Markdown规则解析用正则表达式（模块加载时编译一次，避免每个文件重复查找/编译）
+_MD_SECTION_FLAGS = re.MULTILINE | re.DOTALL | re.IGNORECASE
+_MD_SECTION_PATTERNS = (
+    ('guideline', re.compile(r'##?\s*(?:指导原则|Guideline|Guidelines?|规则|Rules?)\s*\n(.*?)(?=\n##|\n---|\Z)', _MD_SECTION_FLAGS)),
+    ('examples', re.compile(r'##?\s*(?:示例|Examples?|样例)\s*\n(.*?)(?=\n##|\n---|\Z)', _MD_SECTION_FLAGS)),
+    ('description', re.compile(r'##?\s*(?:描述|Description|说明)\s*\n(.*?)(?=\n##|\n---|\Z)', _MD_SECTION_FLAGS)),
+    ('bad_examples', re.compile(r'##?\s*(?:错误示例|Bad Examples?|反例)\s*\n(.*?)(?=\n##|\n---|\Z)', _MD_SECTION_FLAGS)),
+)
+_MD_GOOD_EXAMPLE_RE = re.compile(r'(?:好的|Good|正确).*?\n```(\w+)?\n(.*?)```', re.DOTALL | re.IGNORECASE)
+_MD_BAD_EXAMPLE_RE = re.compile(r'(?:坏的|Bad|错误).*?\n```(\w+)?\n(.*?)```', re.DOTALL | re.IGNORECASE)
+_MD_CODE_BLOCK_RE = re.compile(r'```(\w+)?\n(.*?)```', re.DOTALL)
+# 标题行：在整段文本上一次扫描，标题与正文之间的空白不跨行
+_MD_HEADING_RE = re.compile(r'^(#{1,6})[^\S\n]+(.+)', re.MULTILINE)
+
 class RuleImportError(Exception):
     """规则导入过程中的错误"""
     pass
@@ -121,22 +143,16 @@ class MarkdownRuleParser(RuleParser):
         # 提取所有章节结构
         sections['sections'] = self._extract_main_sections(content)
         # 提取不同的章节（兼容原有逻辑）
-        patterns = {
-            'guideline': r'##?\s*(?:指导原则|Guideline|Guidelines?|规则|Rules?)\s*\n(.*?)(?=\n##|\n---|\Z)',
-            'examples': r'##?\s*(?:示例|Examples?|样例)\s*\n(.*?)(?=\n##|\n---|\Z)',
-            'description': r'##?\s*(?:描述|Description|说明)\s*\n(.*?)(?=\n##|\n---|\Z)',
-            'bad_examples': r'##?\s*(?:错误示例|Bad Examples?|反例)\s*\n(.*?)(?=\n##|\n---|\Z)'
-        }
-        for section, pattern in patterns.items():
-            match = re.search(pattern, content, re.MULTILINE | re.DOTALL | re.IGNORECASE)
+        for section, pattern in _MD_SECTION_PATTERNS:
+            match = pattern.search(content)
             if match:
                 sections[section] = match.group(1).strip()
         # 提取代码示例
         examples = []
         if 'examples' in sections:
             examples_text = sections['examples']
-            good_examples = re.findall(r'(?:好的|Good|正确).*?\n```(\w+)?\n(.*?)```', examples_text, re.DOTALL | re.IGNORECASE)
-            bad_examples = re.findall(r'(?:坏的|Bad|错误).*?\n```(\w+)?\n(.*?)```', examples_text, re.DOTALL | re.IGNORECASE)
+            good_examples = _MD_GOOD_EXAMPLE_RE.findall(examples_text)
+            bad_examples = _MD_BAD_EXAMPLE_RE.findall(examples_text)
             if good_examples:
                 for lang, code in good_examples:
                     examples.append({'good': code.strip(), 'explanation': '良好的代码示例'})
@@ -146,7 +162,7 @@ class MarkdownRuleParser(RuleParser):
                         examples[i]['bad'] = code.strip()
                     else:
                         examples.append({'bad': code.strip(), 'explanation': '错误的代码示例'})
-        code_blocks = re.findall(r'```(\w+)?\n(.*?)```', content, re.DOTALL)
+        code_blocks = _MD_CODE_BLOCK_RE.findall(content)
         for lang, code in code_blocks:
             if code.strip():
                 examples.append({'code': code.strip(), 'language': lang or 'text', 'explanation': '代码示例'})
@@ -157,40 +173,17 @@ class MarkdownRuleParser(RuleParser):
         """提取主要章节内容"""
         sections = []
         
-        # 分割内容为行
-        lines = content.split('\n')
-        current_section = None
-        section_lines = []
-        
-        for line in lines:
-            # 检查是否是标题行
-            heading_match = re.match(r'^(#{1,6})\s+(.+)', line)
-            if heading_match:
-                # 保存之前的章节
-                if current_section and section_lines:
-                    current_section['content'] = '\n'.join(section_lines).strip()
-                    if current_section['content']:  # 只保存有内容的章节
-                        sections.append(current_section)
-                
-                # 开始新章节
-                level = len(heading_match.group(1))
-                title = heading_match.group(2).strip()
-                current_section = {
-                    'level': level,
-                    'title': title,
-                    'content': ''
-                }
-                section_lines = []
-            else:
-                # 添加到当前章节内容
-                if current_section:
-                    section_lines.append(line)
-        
-        # 处理最后一个章节
-        if current_section and section_lines:
-            current_section['content'] = '\n'.join(section_lines).strip()
-            if current_section['content']:
-                sections.append(current_section)
+        # 一次扫描定位所有标题行，章节内容为相邻两个标题行之间的文本
+        headings = list(_MD_HEADING_RE.finditer(content))
+        for i, heading_match in enumerate(headings):
+            end = headings[i + 1].start() if i + 1 < len(headings) else len(content)
+            section_content = content[heading_match.end():end].strip()
+            if section_content:  # 只保存有内容的章节
+                sections.append({
+                    'level': len(heading_match.group(1)),
+                    'title': heading_match.group(2).strip(),
+                    'content': section_content
+                })
         
         return sections
     
@@ -541,6 +534,43 @@ class MarkdownRuleParser(RuleParser):
         return severity_mapping.get(severity.lower(), ValidationSeverity.WARNING)
 
 
+# 内容截断标记，出现时说明导入的规则内容不完整
+_TRUNCATION_MARKERS = (
+    '[... 其余内容 ...]',
+    '[...其余内容...]',
+    '[... 内容省略以保持简洁 ...]',
+    '[...内容省略以保持简洁...]',
+    '[...省略...]',
+    '[省略]',
+    '[...]'
+)
+
+
+def _has_truncation(text: Any) -> bool:
+    """检查文本中是否包含截断标记"""
+    return isinstance(text, str) and any(marker in text for marker in _TRUNCATION_MARKERS)
+
+
+def _find_truncation(d: dict) -> Optional[str]:
+    """递归查找字典中的截断标记，返回其位置描述"""
+    for key, value in d.items():
+        if isinstance(value, str) and _has_truncation(value):
+            return f"在字段 '{key}' 中发现内容截断标记"
+        elif isinstance(value, list):
+            for i, item in enumerate(value):
+                if isinstance(item, dict):
+                    result = _find_truncation(item)
+                    if result:
+                        return f"在列表索引 {i} 的 {result}"
+                elif _has_truncation(item):
+                    return f"在列表索引 {i} 中发现内容截断标记"
+        elif isinstance(value, dict):
+            result = _find_truncation(value)
+            if result:
+                return f"在嵌套字典的 {result}"
+    return None
+
+
 class YamlRuleParser(RuleParser):
     """YAML格式规则解析器"""
     
@@ -561,49 +591,13 @@ class YamlRuleParser(RuleParser):
         """解析YAML文件"""
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
+                data = yaml.load(f, Loader=YamlSafeLoader)
             
             if not data:
                 raise ValueError(f"YAML文件为空: {file_path}")
             
-            # 检查是否包含 [...] 类型的截断标记
-            truncation_markers = [
-                '[... 其余内容 ...]',
-                '[...其余内容...]',
-                '[... 内容省略以保持简洁 ...]',
-                '[...内容省略以保持简洁...]',
-                '[...省略...]',
-                '[省略]',
-                '[...]'
-            ]
-            
-            def check_truncation(text: str) -> bool:
-                if isinstance(text, str):
-                    for marker in truncation_markers:
-                        if marker in text:
-                            return True
-                return False
-            
-            def find_truncation_in_dict(d: dict) -> Optional[str]:
-                for key, value in d.items():
-                    if isinstance(value, str) and check_truncation(value):
-                        return f"在字段 '{key}' 中发现内容截断标记"
-                    elif isinstance(value, list):
-                        for i, item in enumerate(value):
-                            if isinstance(item, dict):
-                                result = find_truncation_in_dict(item)
-                                if result:
-                                    return f"在列表索引 {i} 的 {result}"
-                            elif check_truncation(item):
-                                return f"在列表索引 {i} 中发现内容截断标记"
-                    elif isinstance(value, dict):
-                        result = find_truncation_in_dict(value)
-                        if result:
-                            return f"在嵌套字典的 {result}"
-                return None
-
             # 检查是否存在截断标记
-            truncation_location = find_truncation_in_dict(data)
+            truncation_location = _find_truncation(data)
             if truncation_location:
                 raise ValueError(f"发现内容截断 ({truncation_location})。请使用分批导入:\n"
                                  "1. 设置 append_mode=True\n"
@@ -720,49 +714,32 @@ class YamlRuleParser(RuleParser):
             RuleImportError: 导入失败时抛出
         """
         try:
-            data = yaml.safe_load(content)
-            
-            if not data:
-                raise RuleImportError("内容为空或格式错误")
+            data = yaml.load(content, Loader=YamlSafeLoader)
+        except yaml.YAMLError as e:
+            raise RuleImportError(f"YAML解析错误: {e}")
+        return self.import_data(data, merge, append_mode)
 
-            # 检查是否包含 [...] 类型的截断标记
-            truncation_markers = [
-                '[... 其余内容 ...]',
-                '[...其余内容...]',
-                '[... 内容省略以保持简洁 ...]',
-                '[...内容省略以保持简洁...]',
-                '[...省略...]',
-                '[省略]',
-                '[...]'
-            ]
+    def import_data(self, data: Any, merge: bool = False, append_mode: bool = False) -> List[CursorRule]:
+        """
+        从已解析的规则数据（字典或字典列表）导入规则，跳过YAML解析
+        
+        Args:
+            data: 规则数据
+            merge: 是否合并已存在的规则
+            append_mode: 是否为追加模式，用于分批导入大内容
             
-            def check_truncation(text: str) -> bool:
-                if isinstance(text, str):
-                    for marker in truncation_markers:
-                        if marker in text:
-                            return True
-                return False
+        Returns:
+            导入的规则列表
             
-            def find_truncation_in_dict(d: dict) -> Optional[str]:
-                for key, value in d.items():
-                    if isinstance(value, str) and check_truncation(value):
-                        return f"在字段 '{key}' 中发现内容截断标记"
-                    elif isinstance(value, list):
-                        for i, item in enumerate(value):
-                            if isinstance(item, dict):
-                                result = find_truncation_in_dict(item)
-                                if result:
-                                    return f"在列表索引 {i} 的 {result}"
-                            elif check_truncation(item):
-                                return f"在列表索引 {i} 中发现内容截断标记"
-                    elif isinstance(value, dict):
-                        result = find_truncation_in_dict(value)
-                        if result:
-                            return f"在嵌套字典的 {result}"
-                return None
+        Raises:
+            RuleImportError: 导入失败时抛出
+        """
+        try:
+            if not data:
+                raise RuleImportError("内容为空或格式错误")
 
             # 检查是否存在截断标记
-            truncation_location = find_truncation_in_dict(data)
+            truncation_location = _find_truncation(data)
             if truncation_location and not append_mode:
                 raise RuleImportError(
                     f"发现内容截断 ({truncation_location})。请使用分批导入:\n"
@@ -795,8 +772,6 @@ class YamlRuleParser(RuleParser):
             else:
                 raise RuleImportError("无效的YAML格式")
 
-        except yaml.YAMLError as e:
-            raise RuleImportError(f"YAML解析错误: {e}")
         except Exception as e:
             raise RuleImportError(f"导入规则失败: {e}")
 
@@ -865,8 +840,8 @@ class JsonRuleParser(RuleParser):
     def parse(self, file_path: Path) -> List[CursorRule]:
         """解析JSON文件"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            with open(file_path, 'rb') as f:
+                data = _json.loads(f.read())
             
             if not data:
                 raise ValueError(f"JSON文件为空: {file_path}")
@@ -892,6 +867,25 @@ class JsonRuleParser(RuleParser):
             raise
 
 
+def _scan_files(dir_path: str, extensions, recursive: bool, found: List[Path]) -> List[Path]:
+    """用os.scandir扫描目录中指定扩展名的文件
+    
+    目录项类型直接取自dirent，无需逐项stat；先列出本目录文件再依次进入子目录，
+    顺序与 Path.glob('**/*') 一致，不跟随指向目录的符号链接。
+    """
+    subdirs = []
+    with os.scandir(dir_path) as entries:
+        for entry in entries:
+            if entry.is_file():
+                if os.path.splitext(entry.name)[1].lower() in extensions:
+                    found.append(Path(entry.path))
+            elif recursive and entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+    for subdir in subdirs:
+        _scan_files(subdir, extensions, recursive, found)
+    return found
+
+
 class UnifiedRuleImporter:
     """统一规则导入器"""
     
@@ -932,39 +926,10 @@ class UnifiedRuleImporter:
         await self._ensure_parsers_initialized()
         rules = await self.import_rules(paths, recursive, format_hint)
         
-        # 保存到数据库
+        # 保存到数据库：先逐条确定需要写入的规则，再批量写入并只重建一次索引
         if self.save_to_database and self.database:
-            for rule in rules:
-                # 初始化保存路径
-                    rule_filename = f"{rule.rule_id.lower().replace('-', '_')}.yaml"
-                save_path = Path(self.database.data_dir) / "imported" / rule_filename
-                    
-                try:
-                    # 检查是否已存在
-                    exists = rule.rule_id in self.database.rules
-                    
-                    if exists:
-                        if merge is True:
-                            # 允许覆盖
-                    await self.database.add_rule(rule, save_path)
-                            self._log_success(str(save_path), f"覆盖已存在规则: {rule.rule_id}")
-                        elif interactive:
-                            # 命令行交互
-                            resp = input(f"⚠️ 检测到重复 rule_id: {rule.rule_id}，是否覆盖？[y/N]: ").strip().lower()
-                            if resp == 'y':
-                                await self.database.add_rule(rule, save_path)
-                                self._log_success(str(save_path), f"用户确认覆盖已存在规则: {rule.rule_id}")
-                            else:
-                                self._log_error(str(save_path), f"检测到重复 rule_id: {rule.rule_id}，用户选择跳过")
-                        else:
-                            # 非交互/未指定merge，直接报错
-                            self._log_error(str(save_path), f"检测到重复 rule_id: {rule.rule_id}，未指定 merge，已跳过。请设置 merge=True 以允许覆盖。")
-                    else:
-                        # 不存在，正常添加
-                        await self.database.add_rule(rule, save_path)
-                        self._log_success(str(save_path), f"成功导入规则: {rule.rule_id}")
-                except Exception as e:
-                    self._log_error(str(save_path), f"❌ 保存规则到数据库失败 {rule.rule_id}: {e}")
+            pending = self._plan_upserts(rules, set(), merge, interactive)
+            await self._upsert_pending(pending)
         return rules
 
     async def import_rules(self, 
@@ -982,21 +947,145 @@ class UnifiedRuleImporter:
             导入的规则列表
         """
         await self._ensure_parsers_initialized()
-        all_rules = []
         
-        for path in paths:
-            path = Path(path)
+        # 各路径相互独立，并发导入，结果按路径顺序合并
+        results = await asyncio.gather(
+            *(self._import_path(Path(path), recursive, format_hint) for path in paths)
+        )
+        return [rule for rules in results for rule in rules]
+    
+    def _plan_upserts(self, rules: List[CursorRule], seen_ids: Set[str],
+                      merge: Optional[bool] = None, interactive: bool = False) -> List[Tuple[CursorRule, Path, bool]]:
+        """确定需要写入数据库的规则，重复的 rule_id 按 merge/交互确认处理
+        
+        Args:
+            rules: 待保存的规则
+            seen_ids: 本次导入中已处理过的 rule_id，跨批次调用时传入同一个集合
+            merge: 是否允许覆盖已存在的规则
+            interactive: 是否在命令行询问是否覆盖
+            
+        Returns:
+            [(规则, 保存路径, 是否覆盖已存在规则), ...]
+        """
+        pending = []
+        for rule in rules:
+            # 初始化保存路径
+            rule_filename = f"{rule.rule_id.lower().replace('-', '_')}.yaml"
+            save_path = Path(self.database.data_dir) / "imported" / rule_filename
+            
+            # 检查是否已存在（包括本次导入中先出现的同名规则）
+            exists = rule.rule_id in self.database.rules or rule.rule_id in seen_ids
             
+            if exists:
+                if merge is True:
+                    # 允许覆盖
+                    pending.append((rule, save_path, True))
+                elif interactive:
+                    # 命令行交互
+                    resp = input(f"⚠️ 检测到重复 rule_id: {rule.rule_id}，是否覆盖？[y/N]: ").strip().lower()
+                    if resp == 'y':
+                        pending.append((rule, save_path, True))
+                    else:
+                        self._log_error(str(save_path), f"检测到重复 rule_id: {rule.rule_id}，用户选择跳过")
+                else:
+                    # 非交互/未指定merge，直接报错
+                    self._log_error(str(save_path), f"检测到重复 rule_id: {rule.rule_id}，未指定 merge，已跳过。请设置 merge=True 以允许覆盖。")
+            else:
+                # 不存在，正常添加
+                pending.append((rule, save_path, False))
+            seen_ids.add(rule.rule_id)
+        return pending
+    
+    async def _upsert_pending(self, pending: List[Tuple[CursorRule, Path, bool]]) -> bool:
+        """批量写入规则并只重建一次索引，返回是否写入成功"""
+        if not pending:
+            return True
+        try:
+            added, updated = await self.database.upsert_rules([rule for rule, _, _ in pending], save=True)
+        except Exception as e:
+            for rule, save_path, _ in pending:
+                self._log_error(str(save_path), f"❌ 保存规则到数据库失败 {rule.rule_id}: {e}")
+            return False
+        for rule, save_path, overwrite in pending:
+            if overwrite:
+                self._log_success(str(save_path), f"覆盖已存在规则: {rule.rule_id}")
+            else:
+                self._log_success(str(save_path), f"成功导入规则: {rule.rule_id}")
+        logger.info(f"规则已保存到数据库: 新增 {added} 条，覆盖 {updated} 条")
+        return True
+    
+    async def iter_import_rules(self,
+                                paths: List[Union[str, Path]],
+                                recursive: bool = False,
+                                format_hint: Optional[str] = None,
+                                merge: Optional[bool] = None) -> AsyncIterator[bytes]:
+        """流式导入规则：各文件并发解析，每个文件解析完成后立即保存其规则并逐条产出NDJSON结果
+        
+        Args:
+            paths: 文件或目录路径列表
+            recursive: 是否递归扫描目录
+            format_hint: 格式提示 ('markdown', 'yaml', 'json', 'auto')
+            merge: 是否允许覆盖已存在的规则
+            
+        Yields:
+            每条规则一行 {"file", "rule_id", "status"}，status 为 ok/updated/skipped/error；
+            最后一行为导入汇总 {"status": "done", "imported", "total_files", "successful_imports", "failed_imports"}
+        """
+        await self._ensure_parsers_initialized()
+        
+        file_paths = []
+        for path in map(Path, paths):
             if path.is_file():
-                rules = await self._import_file(path, format_hint)
-                all_rules.extend(rules)
+                file_paths.append(path)
             elif path.is_dir():
-                rules = await self._import_directory(path, recursive, format_hint)
-                all_rules.extend(rules)
+                file_paths.extend(self._collect_files(path, recursive, format_hint))
             else:
                 self._log_error(str(path), f"路径不存在: {path}")
         
-        return all_rules
+        async def import_one(file_path: Path) -> Tuple[Path, List[CursorRule]]:
+            return file_path, await self._import_file(file_path, format_hint)
+        
+        tasks = [asyncio.ensure_future(import_one(file_path)) for file_path in file_paths]
+        seen_ids: Set[str] = set()
+        imported = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                file_path, rules = await next_done
+                saved = {}  # rule_id -> 状态
+                if self.save_to_database and self.database:
+                    pending = self._plan_upserts(rules, seen_ids, merge)
+                    ok = await self._upsert_pending(pending)
+                    for rule, _, overwrite in pending:
+                        saved[rule.rule_id] = ("updated" if overwrite else "ok") if ok else "error"
+                else:
+                    saved = {rule.rule_id: "ok" for rule in rules}
+                for rule in rules:
+                    status = saved.get(rule.rule_id, "skipped")
+                    if status in ("ok", "updated"):
+                        imported += 1
+                    yield _json.dumpb({"file": str(file_path), "rule_id": rule.rule_id, "status": status}) + b"\n"
+        finally:
+            # 调用方提前停止迭代时取消尚未完成的解析
+            for task in tasks:
+                task.cancel()
+        
+        summary = self.get_import_summary()
+        yield _json.dumpb({
+            "status": "done",
+            "imported": imported,
+            "total_files": summary['total_files'],
+            "successful_imports": summary['successful_imports'],
+            "failed_imports": summary['failed_imports']
+        }) + b"\n"
+    
+    async def _import_path(self, path: Path, recursive: bool, format_hint: Optional[str] = None) -> List[CursorRule]:
+        """导入单个文件或目录"""
+        if path.is_file():
+            return await self._import_file(path, format_hint)
+        if path.is_dir():
+            return await self._import_directory(path, recursive, format_hint)
+        self._log_error(str(path), f"路径不存在: {path}")
+        return []
     
     async def _import_file(self, file_path: Path, format_hint: Optional[str] = None) -> List[CursorRule]:
         """导入单个文件"""
@@ -1012,8 +1101,8 @@ class UnifiedRuleImporter:
                 self._log_error(str(file_path), f"不支持的文件格式: {file_path.suffix}")
                 return []
             
-            # 解析文件
-            rules = parser.parse(file_path)
+            # 在线程中解析文件，使多个文件的读取与解析相互重叠
+            rules = await asyncio.to_thread(parser.parse, file_path)
             
             for rule in rules:
                 self._log_success(str(file_path), f"成功导入规则: {rule.rule_id}")
@@ -1024,10 +1113,8 @@ class UnifiedRuleImporter:
             self._log_error(str(file_path), f"导入失败: {e}")
             return []
     
-    async def _import_directory(self, dir_path: Path, recursive: bool, format_hint: Optional[str] = None) -> List[CursorRule]:
-        """导入目录中的文件"""
-        all_rules = []
-        
+    def _collect_files(self, dir_path: Path, recursive: bool, format_hint: Optional[str] = None) -> List[Path]:
+        """扫描目录中可导入的规则文件"""
         # 支持的文件扩展名
         extensions = ['.md', '.markdown', '.yaml', '.yml', '.json']
         
@@ -1039,12 +1126,17 @@ class UnifiedRuleImporter:
             elif format_hint.lower() == 'json':
                 extensions = ['.json']
         
-        # 扫描文件
-        pattern = '**/*' if recursive else '*'
-        for file_path in dir_path.glob(pattern):
-            if file_path.is_file() and file_path.suffix.lower() in extensions:
-                rules = await self._import_file(file_path, format_hint)
-                all_rules.extend(rules)
+        return _scan_files(str(dir_path), extensions, recursive, [])
+    
+    async def _import_directory(self, dir_path: Path, recursive: bool, format_hint: Optional[str] = None) -> List[CursorRule]:
+        """导入目录中的文件"""
+        all_rules = []
+        
+        # 扫描文件并并发导入
+        file_paths = self._collect_files(dir_path, recursive, format_hint)
+        results = await asyncio.gather(*(self._import_file(file_path, format_hint) for file_path in file_paths))
+        for rules in results:
+            all_rules.extend(rules)
         
         return all_rules
     
@@ -10,9 +10,11 @@ License: MIT
 """
 
 import asyncio
+import itertools
 import json
 import logging
-from typing import List, Dict, Any, Optional, Union
+import os
+from typing import List, Dict, Any, Optional, Union, Callable
 from pathlib import Path
 import sys
 import traceback
@@ -25,7 +27,9 @@ except ImportError:
     print("MCP库未安装，请运行: pip install mcp")
     sys.exit(1)
 
-from .engine import RuleEngine
+from .engine import RuleEngine, parse_filter_param
+from ._fastval import warmup as warmup_fastval
+from .validators import get_temp_dir
 from .models import (
     MCPContext, SearchFilter, ValidationSeverity, RuleType,
     ContentType, TaskType
@@ -43,15 +47,26 @@ class CursorRulesMCPServer:
     提供规则搜索、内容验证、模板获取等功能
     """
     
-    def __init__(self, rules_dir: str = "data/rules"):
+    def __init__(self, rules_dir: str = "data/rules", rule_engine: Optional[RuleEngine] = None):
         """初始化MCP服务器
         
         Args:
             rules_dir: 规则目录路径
+            rule_engine: 可选的规则引擎实例，传入已初始化的引擎时不再重复加载规则
         """
         self.mcp = FastMCP("cursorrules-mcp")
-        self.rule_engine = RuleEngine(rules_dir)
+        self.rule_engine = rule_engine if rule_engine is not None else RuleEngine(rules_dir)
         self._initialized = False
+        
+        # 预热验证加速内核，避免首个validate_content请求承担编译开销
+        warmup_fastval()
+        
+        # 规则详情渲染缓存，规则集版本变化时失效
+        self._rendered_rules: Dict[str, str] = {}
+        self._rendered_rev = -1
+        
+        # 工具名称 -> 处理函数，注册工具时填充，进程内调用时直接按名称取用
+        self.tools: Dict[str, Callable] = {}
         self.setup_handlers()
         
     def setup_handlers(self):
@@ -117,58 +132,18 @@ class CursorRulesMCPServer:
 ---
 """
                 
+                parts = [result_text]
                 for i, applicable_rule in enumerate(applicable_rules, 1):
                     rule = applicable_rule.rule
                     
-                    # 构建规则详情文本
-                    rule_text = f"""
-## {i}. {rule.name}
-**ID**: `{rule.rule_id}` | **版本**: {rule.version} | **相关度**: {applicable_rule.relevance_score:.2f}
-
-**描述**: {rule.description}
-
-**分类信息**:
-- 🏷️ **类型**: {rule.rule_type.value}
-- 💻 **语言**: {', '.join(rule.languages) if rule.languages else '通用'}
-- 🌍 **领域**: {', '.join(rule.domains) if rule.domains else '通用'}
-- 📝 **内容类型**: {', '.join([ct.value for ct in rule.content_types]) if rule.content_types else '通用'}
-- 🏪 **标签**: {', '.join(rule.tags)}
-
-**规则详情**:
-"""
-                    
-                    # 添加规则条件
-                    for j, condition in enumerate(rule.rules[:3], 1):  # 最多显示3个条件
-                        rule_text += f"""
-### {j}. {condition.condition}
-**指导原则**: {condition.guideline}
-**优先级**: {condition.priority}/10
-
-"""
-                        # 添加示例
-                        if condition.examples:
-                            example = condition.examples[0]
-                            if isinstance(example, dict):
-                                if example.get('good'):
-                                    rule_text += f"**✅ 良好示例**:\n```\n{example['good']}\n```\n\n"
-                                if example.get('bad'):
-                                    rule_text += f"**❌ 不良示例**:\n```\n{example['bad']}\n```\n\n"
-                                if example.get('explanation'):
-                                    rule_text += f"**💡 说明**: {example['explanation']}\n\n"
-                    
-                    # 添加验证信息
-                    if rule.validation and rule.validation.tools:
-                        rule_text += f"**🔧 验证工具**: {', '.join(rule.validation.tools)}\n"
-                        rule_text += f"**⚠️ 违规严重程度**: {rule.validation.severity.value}\n"
-                    
-                    # 添加使用统计
-                    rule_text += f"\n**📊 使用统计**: 使用次数 {rule.usage_count} | 成功率 {rule.success_rate:.1%}\n"
-                    
-                    rule_text += "\n---\n"
-                    
-                    result_text += rule_text
+                    # 标题行含序号和相关度，规则详情部分复用缓存
+                    parts.append(
+                        f"\n## {i}. {rule.name}\n"
+                        f"**ID**: `{rule.rule_id}` | **版本**: {rule.version} | **相关度**: {applicable_rule.relevance_score:.2f}\n"
+                    )
+                    parts.append(self._get_rendered_rule(rule))
                 
-                return result_text
+                return ''.join(parts)
                 
             except Exception as e:
                 logger.error(f"搜索规则时发生错误: {e}")
@@ -406,8 +381,11 @@ class CursorRulesMCPServer:
 
 **版本分布**:
 """
-                for rule_id, version_count in list(stats['version_distribution'].items())[:5]:
-                    result_text += f"- {rule_id}: {version_count} 个版本\n"
+                # 只取前5条，不为整个版本分布生成列表
+                result_text += "".join(
+                    f"- {rule_id}: {version_count} 个版本\n"
+                    for rule_id, version_count in itertools.islice(stats['version_distribution'].items(), 5)
+                )
                 
                 if len(stats['version_distribution']) > 5:
                     result_text += f"- ... 还有 {len(stats['version_distribution']) - 5} 个规则\n"
@@ -467,7 +445,7 @@ class CursorRulesMCPServer:
                     try:
                         ext_map = {'markdown': '.md', 'yaml': '.yaml', 'json': '.json'}
                         ext = ext_map.get(format, '.txt')
-                        with tempfile.NamedTemporaryFile(mode='w', suffix=ext, delete=False, encoding='utf-8') as temp_file:
+                        with tempfile.NamedTemporaryFile(mode='w', suffix=ext, delete=False, encoding='utf-8', dir=get_temp_dir()) as temp_file:
                             temp_file.write(content)
                             temp_path = temp_file.name
                         rules = await importer.import_rules_async([temp_path])
@@ -483,6 +461,14 @@ class CursorRulesMCPServer:
             except Exception as e:
                 logger.error(f"导入规则时发生错误: {e}")
                 return f"❌ 导入失败: {str(e)}"
+        
+        self.tools.update({
+            "search_rules": search_rules,
+            "validate_content": validate_content,
+            "enhance_prompt": enhance_prompt,
+            "get_statistics": get_statistics,
+            "import_rules": import_rules,
+        })
     
     def _setup_resources(self):
         """设置MCP资源"""
@@ -625,11 +611,67 @@ class CursorRulesMCPServer:
                 logger.error(f"列出规则时发生错误: {e}")
                 return f"❌ 列出规则失败: {str(e)}"
 
+    def _get_rendered_rule(self, rule) -> str:
+        """获取规则详情的渲染文本（不含序号和相关度），规则加载后内容不变，可缓存复用"""
+        if self._rendered_rev != self.rule_engine.rules_revision:
+            self._rendered_rules.clear()
+            self._rendered_rev = self.rule_engine.rules_revision
+        
+        rule_text = self._rendered_rules.get(rule.rule_id)
+        if rule_text is None:
+            rule_text = self._render_rule(rule)
+            self._rendered_rules[rule.rule_id] = rule_text
+        return rule_text
+
+    def _render_rule(self, rule) -> str:
+        """渲染规则详情文本"""
+        parts = [f"""
+**描述**: {rule.description}
+
+**分类信息**:
+- 🏷️ **类型**: {rule.rule_type.value}
+- 💻 **语言**: {', '.join(rule.languages) if rule.languages else '通用'}
+- 🌍 **领域**: {', '.join(rule.domains) if rule.domains else '通用'}
+- 📝 **内容类型**: {', '.join([ct.value for ct in rule.content_types]) if rule.content_types else '通用'}
+- 🏪 **标签**: {', '.join(rule.tags)}
+
+**规则详情**:
+"""]
+        
+        # 添加规则条件
+        for j, condition in enumerate(rule.rules[:3], 1):  # 最多显示3个条件
+            parts.append(f"""
+### {j}. {condition.condition}
+**指导原则**: {condition.guideline}
+**优先级**: {condition.priority}/10
+
+""")
+            # 添加示例
+            if condition.examples:
+                example = condition.examples[0]
+                if isinstance(example, dict):
+                    if example.get('good'):
+                        parts.append(f"**✅ 良好示例**:\n```\n{example['good']}\n```\n\n")
+                    if example.get('bad'):
+                        parts.append(f"**❌ 不良示例**:\n```\n{example['bad']}\n```\n\n")
+                    if example.get('explanation'):
+                        parts.append(f"**💡 说明**: {example['explanation']}\n\n")
+        
+        # 添加验证信息
+        if rule.validation and rule.validation.tools:
+            parts.append(f"**🔧 验证工具**: {', '.join(rule.validation.tools)}\n")
+            parts.append(f"**⚠️ 违规严重程度**: {rule.validation.severity.value}\n")
+        
+        # 添加使用统计
+        parts.append(f"\n**📊 使用统计**: 使用次数 {rule.usage_count} | 成功率 {rule.success_rate:.1%}\n")
+        parts.append("\n---\n")
+        return ''.join(parts)
+
     def _parse_list_param(self, param: str) -> Optional[List[str]]:
         """解析逗号分隔的参数"""
         if not param or not param.strip():
             return None
-        return [item.strip() for item in param.split(',') if item.strip()]
+        return list(parse_filter_param(param))
 
     def _infer_languages_from_path(self, file_path: str) -> List[str]:
         """从文件路径推断编程语言"""
@@ -757,11 +799,12 @@ class CursorRulesMCPServer:
         return ', '.join(conditions) if conditions else '无特定条件'
 
     async def _ensure_initialized(self):
-        """确保规则引擎已初始化"""
+        """确保规则引擎已初始化（引擎自身保证并发请求只加载一次）"""
         if not self._initialized:
             await self.rule_engine.initialize()
-            self._initialized = True
-            logger.info("规则引擎初始化完成")
+            if not self._initialized:
+                self._initialized = True
+                logger.info("规则引擎初始化完成")
 
     def run(self):
         """运行MCP服务器"""
@@ -774,6 +817,19 @@ class CursorRulesMCPServer:
             raise
 
 
+
+# 按规则目录缓存的服务器实例：同一进程内重复获取时复用已初始化的规则引擎和已注册的工具
+_mcp_servers: Dict[str, CursorRulesMCPServer] = {}
+
+
+def get_mcp_server(rules_dir: str = "data/rules") -> CursorRulesMCPServer:
+    """获取指定规则目录的MCP服务器实例（进程内按规则目录单例）"""
+    key = os.path.abspath(rules_dir)
+    server = _mcp_servers.get(key)
+    if server is None:
+        server = _mcp_servers[key] = CursorRulesMCPServer(rules_dir)
+    return server
+
 async def main():
     """主函数"""
     try:
@@ -783,12 +839,15 @@ async def main():
         config_manager = get_config_manager()
         config = config_manager.config
         
-        print("🚀 启动 CursorRules-MCP 服务器...")
-        print(f"📂 规则目录: {config.rules_dir}")
-        print(f"🔧 调试模式: {'开启' if config.debug else '关闭'}")
+        # 启动信息合并为一次写出
+        sys.stdout.write("\n".join([
+            "🚀 启动 CursorRules-MCP 服务器...",
+            f"📂 规则目录: {config.rules_dir}",
+            f"🔧 调试模式: {'开启' if config.debug else '关闭'}",
+        ]) + "\n")
         
         # 创建服务器
-        server = CursorRulesMCPServer(config.rules_dir)
+        server = get_mcp_server(config.rules_dir)
         
         # 启动服务器
         await server.run()
@@ -12,9 +12,11 @@ License: MIT
 import asyncio
 import json
 import logging
+import os
 import re
 import subprocess
 import tempfile
+import time
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from pathlib import Path
@@ -25,6 +27,16 @@ from .models import ValidationIssue, ValidationResult, ValidationSeverity
 
 logger = logging.getLogger(__name__)
 
+# Linux下优先将临时文件放在内存文件系统中，避免落盘
+_TMPFS_DIR = "/dev/shm"
+
+
+def get_temp_dir() -> Optional[str]:
+    """返回临时文件目录：/dev/shm 可写时使用它，否则返回None（使用系统默认临时目录）"""
+    if os.path.isdir(_TMPFS_DIR) and os.access(_TMPFS_DIR, os.W_OK):
+        return _TMPFS_DIR
+    return None
+
 
 @dataclass
 class ToolResult:
@@ -77,9 +89,7 @@ class BaseValidator(ABC):
         Returns:
             执行结果
         """
-        import time
-
-        start_time = time.time()
+        start_time = time.perf_counter()
 
         try:
             process = await asyncio.create_subprocess_exec(
@@ -94,7 +104,7 @@ class BaseValidator(ABC):
                 timeout=self.config.timeout,
             )
 
-            execution_time = time.time() - start_time
+            execution_time = time.perf_counter() - start_time
 
             return ToolResult(
                 success=process.returncode == 0,
@@ -111,7 +121,7 @@ class BaseValidator(ABC):
                 stdout="",
                 stderr="执行超时",
                 return_code=-1,
-                execution_time=time.time() - start_time,
+                execution_time=time.perf_counter() - start_time,
             )
         except Exception as e:
             logger.error(f"执行验证工具 {self.name} 时发生错误: {e}")
@@ -120,7 +130,7 @@ class BaseValidator(ABC):
                 stdout="",
                 stderr=str(e),
                 return_code=-1,
-                execution_time=time.time() - start_time,
+                execution_time=time.perf_counter() - start_time,
             )
 
     def _create_temp_file(self, content: str, suffix: str = ".tmp") -> str:
@@ -134,7 +144,7 @@ class BaseValidator(ABC):
             临时文件路径
         """
         with tempfile.NamedTemporaryFile(
-            mode="w", suffix=suffix, delete=False, encoding="utf-8"
+            mode="w", suffix=suffix, delete=False, encoding="utf-8", dir=get_temp_dir()
         ) as f:
             f.write(content)
             return f.name
@@ -0,0 +1,57 @@
+"""/import_rule/stream 流式导入接口测试"""
+
+import json
+from pathlib import Path
+
+import yaml
+from fastapi.testclient import TestClient
+
+from cursorrules_mcp import database
+from cursorrules_mcp.database import RuleDatabase
+from cursorrules_mcp.http_server import MCPHttpServer
+
+SAMPLE_RULE = Path(__file__).resolve().parents[1] / "data" / "rules" / "examples" / "sample_yaml_rule.yaml"
+
+
+def test_import_rule_stream_yields_one_line_per_rule(tmp_path, monkeypatch):
+    rules_dir = tmp_path / "rules"
+    rules_dir.mkdir()
+    monkeypatch.setattr(database, "_rule_database", RuleDatabase(str(rules_dir)))
+
+    first = SAMPLE_RULE.read_text(encoding="utf-8")
+    data = yaml.safe_load(first)
+    data["rule_id"] = "CR-PY-NAMING-002"
+    second = yaml.safe_dump(data, allow_unicode=True)
+
+    server = MCPHttpServer(rules_dir=str(rules_dir))
+    with TestClient(server.app) as client:
+        with client.stream("POST", "/import_rule/stream", json={
+            "files": [{"content": first, "format": "yaml"}, {"content": second}],
+        }) as response:
+            assert response.status_code == 200
+            assert response.headers["content-type"].startswith("application/x-ndjson")
+            lines = [json.loads(line) for line in response.iter_lines() if line]
+
+    *items, summary = lines
+    assert sorted(item["rule_id"] for item in items) == ["CR-PY-NAMING-001", "CR-PY-NAMING-002"]
+    assert all(item["status"] == "ok" for item in items)
+    assert summary["status"] == "done"
+    assert summary["imported"] == 2
+    assert {"CR-PY-NAMING-001", "CR-PY-NAMING-002"} <= set(database._rule_database.rules)
+    assert "CR-PY-NAMING-002" in server.rule_engine.rules
+
+
+def test_import_rule_stream_skips_existing_rule_without_merge(tmp_path, monkeypatch):
+    rules_dir = tmp_path / "rules"
+    rules_dir.mkdir()
+    monkeypatch.setattr(database, "_rule_database", RuleDatabase(str(rules_dir)))
+    content = SAMPLE_RULE.read_text(encoding="utf-8")
+
+    server = MCPHttpServer(rules_dir=str(rules_dir))
+    with TestClient(server.app) as client:
+        client.post("/import_rule/stream", json={"files": [{"content": content}]})
+        response = client.post("/import_rule/stream", json={"files": [{"content": content}]})
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[0] == {"file": lines[0]["file"], "rule_id": "CR-PY-NAMING-001", "status": "skipped"}
+    assert lines[-1]["imported"] == 0
@@ -0,0 +1,65 @@
+"""规则条件中验证模式（pattern）的校验语义测试"""
+
+import asyncio
+import shutil
+from pathlib import Path
+
+import yaml
+
+from cursorrules_mcp.engine import RuleEngine
+
+SAMPLE_RULE = Path(__file__).resolve().parents[1] / "data" / "rules" / "examples" / "sample_yaml_rule.yaml"
+
+
+def _make_engine(tmp_path: Path, forbidden: bool = False) -> RuleEngine:
+    rules_dir = tmp_path / "rules"
+    rules_dir.mkdir()
+    if forbidden:
+        data = yaml.safe_load(SAMPLE_RULE.read_text(encoding="utf-8"))
+        data["rules"][0]["pattern"] = r"def\s+[a-z]+[A-Z]\w*\s*\("
+        data["rules"][0]["forbidden"] = True
+        (rules_dir / "forbidden_rule.yaml").write_text(
+            yaml.safe_dump(data, allow_unicode=True), encoding="utf-8"
+        )
+    else:
+        shutil.copy(SAMPLE_RULE, rules_dir / SAMPLE_RULE.name)
+    engine = RuleEngine(rules_dir=str(rules_dir), templates_dir=str(tmp_path / "templates"))
+    asyncio.run(engine.initialize())
+    return engine
+
+
+def _pattern_issues(result: dict):
+    return [issue for issue in result["problems"] if "禁止的模式" in issue.message]
+
+
+def test_required_pattern_does_not_flag_conforming_content(tmp_path):
+    engine = _make_engine(tmp_path)
+    assert "CR-PY-NAMING-001" in engine.rules
+
+    result = asyncio.run(engine.validate_content(content="foo\n", languages="python"))
+
+    assert result["passed"] is True
+    assert not _pattern_issues(result)
+
+
+def test_required_pattern_is_not_reported_as_forbidden(tmp_path):
+    engine = _make_engine(tmp_path)
+
+    result = asyncio.run(engine.validate_content(
+        content="def calculate_total(items):\n    return sum(items)\n", languages="python"
+    ))
+
+    assert not _pattern_issues(result)
+
+
+def test_forbidden_pattern_reports_matching_line(tmp_path):
+    engine = _make_engine(tmp_path, forbidden=True)
+
+    result = asyncio.run(engine.validate_content(
+        content="import os\n\ndef calcTotal(items):\n    return sum(items)\n", languages="python"
+    ))
+
+    issues = _pattern_issues(result)
+    assert len(issues) == 1
+    assert issues[0].rule_id == "CR-PY-NAMING-001"
+    assert issues[0].line_number == 3